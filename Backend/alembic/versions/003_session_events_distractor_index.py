@@ -0,0 +1,29 @@
+"""Add partial index for distractor aggregation on session_events
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-03-02
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "003"
+down_revision: Union[str, None] = "002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Covers the top-distractor GROUP BY app_name queries
+    op.create_index(
+        "ix_session_events_session_type_app",
+        "session_events",
+        ["session_id", "event_type", "app_name"],
+        postgresql_where=sa.text("app_name IS NOT NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_session_events_session_type_app", table_name="session_events")
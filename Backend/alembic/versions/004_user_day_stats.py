@@ -0,0 +1,51 @@
+"""Add user_day_stats table of precomputed daily session totals
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-03-04
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "004"
+down_revision: Union[str, None] = "003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "user_day_stats",
+        sa.Column("id", sa.Uuid(), nullable=False),
+        sa.Column("user_id", sa.Uuid(), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("focused_seconds", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("session_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("distraction_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.PrimaryKeyConstraint("id", name="pk_user_day_stats"),
+        sa.ForeignKeyConstraint(
+            ["user_id"], ["users.id"],
+            name="fk_user_day_stats_user_id_users",
+            ondelete="CASCADE",
+        ),
+        sa.UniqueConstraint("user_id", "day", name="uq_user_day_stats_user_day"),
+    )
+
+    # Backfill from the sessions completed so far
+    op.execute(
+        """
+        INSERT INTO user_day_stats
+            (id, user_id, day, focused_seconds, session_count, distraction_count)
+        SELECT gen_random_uuid(), user_id, date(start_time AT TIME ZONE 'UTC'),
+               sum(focused_seconds), count(*), sum(distraction_count)
+        FROM sessions
+        WHERE is_complete
+        GROUP BY user_id, date(start_time AT TIME ZONE 'UTC')
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("user_day_stats")
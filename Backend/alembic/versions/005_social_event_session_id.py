@@ -0,0 +1,48 @@
+"""Add session_id column to social_events for reaction lookups
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-03-05
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "005"
+down_revision: Union[str, None] = "004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("social_events", sa.Column("session_id", sa.Uuid(), nullable=True))
+    op.create_foreign_key(
+        "fk_social_events_session_id_sessions",
+        "social_events", "sessions",
+        ["session_id"], ["id"],
+        ondelete="CASCADE",
+    )
+    op.create_index("ix_social_events_session_id", "social_events", ["session_id"])
+
+    # Backfill from the JSON message of existing reactions, skipping any
+    # whose session no longer exists
+    op.execute(
+        """
+        UPDATE social_events
+        SET session_id = (message::json ->> 'session_id')::uuid
+        WHERE event_type = 'reaction'
+          AND EXISTS (
+              SELECT 1 FROM sessions
+              WHERE sessions.id::text = social_events.message::json ->> 'session_id'
+          )
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_social_events_session_id", table_name="social_events")
+    op.drop_constraint(
+        "fk_social_events_session_id_sessions", "social_events", type_="foreignkey"
+    )
+    op.drop_column("social_events", "session_id")
@@ -0,0 +1,54 @@
+"""Add reaction_type to social_events with a unique reaction index
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-03-05
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "006"
+down_revision: Union[str, None] = "005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("social_events", sa.Column("reaction_type", sa.String(20), nullable=True))
+    op.execute(
+        """
+        UPDATE social_events
+        SET reaction_type = message::json ->> 'reaction_type'
+        WHERE event_type = 'reaction'
+        """
+    )
+
+    # Drop duplicate reactions left by the old check-then-insert path,
+    # keeping the earliest of each
+    op.execute(
+        """
+        DELETE FROM social_events a
+        USING social_events b
+        WHERE a.event_type = 'reaction'
+          AND b.event_type = 'reaction'
+          AND a.from_user_id = b.from_user_id
+          AND a.session_id = b.session_id
+          AND a.reaction_type = b.reaction_type
+          AND (a.timestamp, a.id) > (b.timestamp, b.id)
+        """
+    )
+
+    op.create_index(
+        "uq_social_events_reaction",
+        "social_events",
+        ["from_user_id", "session_id", "reaction_type"],
+        unique=True,
+        postgresql_where=sa.text("event_type = 'reaction'"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("uq_social_events_reaction", table_name="social_events")
+    op.drop_column("social_events", "reaction_type")
@@ -0,0 +1,30 @@
+"""Add composite indexes for listing tasks
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-03-06
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "007"
+down_revision: Union[str, None] = "006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Serves get_tasks' ORDER BY status, priority DESC, sort_order per user
+    op.create_index(
+        "ix_tasks_user_status_priority_sort",
+        "tasks",
+        ["user_id", "status", sa.text("priority DESC"), "sort_order"],
+    )
+    op.create_index("ix_tasks_user_project", "tasks", ["user_id", "project_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_tasks_user_project", table_name="tasks")
+    op.drop_index("ix_tasks_user_status_priority_sort", table_name="tasks")
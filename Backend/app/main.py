@@ -52,6 +52,14 @@ async def lifespan(app: FastAPI):
     yield
 
     # Shutdown
+    from app.services._http import close_shared_client
+    from app.services.ai_coaching_service import cancel_background_refreshes
+    from app.services.email_service import close_smtp
+
+    # Before Redis closes: cancelled refreshes still release their locks
+    await cancel_background_refreshes()
+    await close_shared_client()
+    await close_smtp()
     await app.state.redis.close()
     await engine.dispose()
 
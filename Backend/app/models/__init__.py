@@ -11,6 +11,7 @@ from app.models.social_event import SocialEvent
 from app.models.subscription import Subscription
 from app.models.task import Task
 from app.models.user import User
+from app.models.user_day_stats import UserDayStats
 from app.models.webhook import Webhook
 
 __all__ = [
@@ -27,5 +28,6 @@ __all__ = [
     "Subscription",
     "Task",
     "User",
+    "UserDayStats",
     "Webhook",
 ]
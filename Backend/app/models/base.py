@@ -2,7 +2,7 @@ import uuid
 
 from sqlalchemy import MetaData
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
-from uuid_utils import uuid7
+from uuid_utils.compat import uuid7
 
 # Consistent naming conventions for constraints
 convention = {
@@ -24,6 +24,10 @@ class Session(Base):
         DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
     )
 
+    # Fetch server-generated timestamps in the INSERT itself (RETURNING)
+    # rather than needing a refresh afterwards.
+    __mapper_args__ = {"eager_defaults": True}
+
     # Relationships
     user: Mapped["User"] = relationship(back_populates="sessions")  # noqa: F821
     events: Mapped[list["SessionEvent"]] = relationship(back_populates="session", cascade="all, delete-orphan")  # noqa: F821
@@ -30,4 +30,12 @@ class SessionEvent(Base):
     __table_args__ = (
         Index("ix_session_events_session_timestamp", "session_id", "timestamp"),
         Index("ix_session_events_dedup", "session_id", "event_type", "timestamp", unique=True),
+        Index(
+            "ix_session_events_session_type_app",
+            "session_id",
+            "event_type",
+            "app_name",
+            postgresql_where=app_name.isnot(None),
+            sqlite_where=app_name.isnot(None),
+        ),
     )
@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import DateTime, ForeignKey, String, func
+from sqlalchemy import DateTime, ForeignKey, Index, String, func
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.models.base import Base
@@ -18,8 +18,27 @@ class SocialEvent(Base):
     )
     event_type: Mapped[str] = mapped_column(
         String(50), nullable=False
-    )  # encourage, ping
+    )  # encourage, ping, reaction
     message: Mapped[str | None] = mapped_column(String(500))
+    # Reacted-to session and reaction type for "reaction" events (also kept
+    # in the message JSON)
+    session_id: Mapped[uuid.UUID | None] = mapped_column(
+        ForeignKey("sessions.id", ondelete="CASCADE"), index=True
+    )
+    reaction_type: Mapped[str | None] = mapped_column(String(20))
     timestamp: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now()
     )
+
+    __table_args__ = (
+        # One reaction of each type per user per session
+        Index(
+            "uq_social_events_reaction",
+            "from_user_id",
+            "session_id",
+            "reaction_type",
+            unique=True,
+            postgresql_where=event_type == "reaction",
+            sqlite_where=event_type == "reaction",
+        ),
+    )
@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import DateTime, ForeignKey, Integer, String, func
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, String, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.base import Base
@@ -28,3 +28,15 @@ class Task(Base):
     # Relationships
     user: Mapped["User"] = relationship(back_populates="tasks")  # noqa: F821
     project: Mapped["Project | None"] = relationship(back_populates="tasks")  # noqa: F821
+
+    __table_args__ = (
+        # Matches get_tasks' ORDER BY so the task list is read in index order
+        Index(
+            "ix_tasks_user_status_priority_sort",
+            "user_id",
+            "status",
+            priority.desc(),
+            "sort_order",
+        ),
+        Index("ix_tasks_user_project", "user_id", "project_id"),
+    )
@@ -24,6 +24,10 @@ class User(Base):
         DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
     )
 
+    # Fetch server-generated timestamps in the INSERT itself (RETURNING)
+    # rather than needing a refresh afterwards.
+    __mapper_args__ = {"eager_defaults": True}
+
     # Relationships
     projects: Mapped[list["Project"]] = relationship(back_populates="user", cascade="all, delete-orphan")  # noqa: F821
     tasks: Mapped[list["Task"]] = relationship(back_populates="user", cascade="all, delete-orphan")  # noqa: F821
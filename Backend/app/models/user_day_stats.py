@@ -0,0 +1,29 @@
+import uuid
+from datetime import date
+
+from sqlalchemy import Date, ForeignKey, Integer, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.base import Base
+
+
+class UserDayStats(Base):
+    """Per-user daily totals of completed sessions, keyed by UTC start date.
+
+    Maintained by session_service as sessions complete, so daily trends read
+    at most one row per day instead of aggregating sessions.
+    """
+
+    __tablename__ = "user_day_stats"
+
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+    )
+    day: Mapped[date] = mapped_column(Date, nullable=False)
+    focused_seconds: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    session_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    distraction_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        UniqueConstraint("user_id", "day", name="uq_user_day_stats_user_day"),
+    )
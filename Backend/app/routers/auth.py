@@ -94,7 +94,7 @@ async def register(request: RegisterRequest, db: AsyncSession = Depends(get_db))
 async def login_email(request: EmailLoginRequest, db: AsyncSession = Depends(get_db)):
     """Sign in with email and password."""
     try:
-        user = await auth_service.login_with_email(
+        user_id = await auth_service.login_with_email(
             db=db,
             email=request.email,
             password=request.password,
@@ -105,7 +105,7 @@ async def login_email(request: EmailLoginRequest, db: AsyncSession = Depends(get
             detail=str(e),
         )
 
-    tokens = auth_service.issue_tokens(user.id)
+    tokens = auth_service.issue_tokens(user_id)
     return TokenResponse(**tokens)
 
 
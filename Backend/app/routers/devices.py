@@ -1,6 +1,6 @@
 import uuid
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -9,6 +9,7 @@ from app.dependencies import get_current_user
 from app.models.device import Device
 from app.models.user import User
 from app.schemas.device import DeviceRegister, DeviceResponse
+from app.services.notification_service import invalidate_user_devices
 
 router = APIRouter(prefix="/devices", tags=["devices"])
 
@@ -16,6 +17,7 @@ router = APIRouter(prefix="/devices", tags=["devices"])
 @router.post("/register", response_model=DeviceResponse, status_code=201)
 async def register_device(
     data: DeviceRegister,
+    req: Request,
     user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
@@ -26,10 +28,13 @@ async def register_device(
     existing = result.scalar_one_or_none()
 
     if existing:
+        previous_user_id = existing.user_id
         existing.user_id = user.id
         existing.platform = data.platform
         await db.flush()
         await db.refresh(existing)
+        await db.commit()
+        await invalidate_user_devices(req.app.state.redis, previous_user_id, user.id)
         return existing
 
     device = Device(
@@ -40,12 +45,15 @@ async def register_device(
     db.add(device)
     await db.flush()
     await db.refresh(device)
+    await db.commit()
+    await invalidate_user_devices(req.app.state.redis, user.id)
     return device
 
 
 @router.delete("/{device_id}", status_code=204)
 async def unregister_device(
     device_id: uuid.UUID,
+    req: Request,
     user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
@@ -59,3 +67,5 @@ async def unregister_device(
             status_code=status.HTTP_404_NOT_FOUND, detail="Device not found"
         )
     await db.delete(device)
+    await db.commit()
+    await invalidate_user_devices(req.app.state.redis, user.id)
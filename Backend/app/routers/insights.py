@@ -1,6 +1,7 @@
 import uuid
 
 from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import settings
@@ -21,6 +22,7 @@ from app.services.ai_coaching_service import (
     generate_coaching_nudge,
     generate_goal_suggestions,
     generate_session_summary,
+    generate_session_summary_stream,
 )
 
 router = APIRouter(prefix="/insights", tags=["insights"])
@@ -91,6 +93,25 @@ async def session_summary(
     )
 
 
+@router.post("/session-summary/stream")
+async def session_summary_stream(
+    session_id: uuid.UUID,
+    req: Request,
+    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Stream an AI-powered session summary as plain text chunks."""
+    provider = create_provider(settings)
+    redis_client = getattr(req.app.state, "redis", None)
+
+    return StreamingResponse(
+        generate_session_summary_stream(
+            db, user.id, session_id, provider, redis_client
+        ),
+        media_type="text/plain; charset=utf-8",
+    )
+
+
 @router.get("/nudge", response_model=AICoachingNudge)
 async def coaching_nudge(
     req: Request,
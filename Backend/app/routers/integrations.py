@@ -170,4 +170,5 @@ async def import_notion_tasks(
     return TaskImportResponse(
         imported_count=len(tasks),
         tasks=[TaskImportResult(**t) for t in tasks],
+        truncated=importer.truncated,
     )
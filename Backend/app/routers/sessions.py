@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
@@ -14,7 +14,7 @@ from app.schemas.session import (
     SessionResponse,
     SessionUpdate,
 )
-from app.services import session_service
+from app.services import session_service, social_service
 
 router = APIRouter(prefix="/sessions", tags=["sessions"])
 
@@ -47,6 +47,7 @@ async def create_session(
 async def update_session(
     session_id: uuid.UUID,
     data: SessionUpdate,
+    req: Request,
     user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
@@ -57,6 +58,13 @@ async def update_session(
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Session not found"
         )
+    redis_client = getattr(req.app.state, "redis", None)
+    if session.is_complete and redis_client is not None:
+        # Completed sessions change the user's group leaderboard totals.
+        # Commit first, or a concurrent leaderboard read could cache the old
+        # totals again before they are visible.
+        await db.commit()
+        await social_service.invalidate_leaderboards(db, user.id, redis_client)
     return session
 
 
@@ -130,11 +130,14 @@ async def create_group(
 @router.get("/groups/{group_id}/leaderboard", response_model=list[LeaderboardEntry])
 async def group_leaderboard(
     group_id: uuid.UUID,
+    req: Request,
     user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     try:
-        return await social_service.get_leaderboard(db, group_id, user.id)
+        return await social_service.get_leaderboard(
+            db, group_id, user.id, req.app.state.redis
+        )
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(e))
 
@@ -148,7 +151,8 @@ async def encourage(
 ):
     try:
         await social_service.send_encourage(
-            db, user.id, data.to_user_id, data.message, req.app.state.apns_client
+            db, user.id, data.to_user_id, data.message,
+            req.app.state.apns_client, req.app.state.redis,
         )
         return {"status": "sent"}
     except ValueError as e:
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
@@ -16,17 +16,21 @@ router = APIRouter(prefix="/subscriptions", tags=["subscriptions"])
 
 @router.get("/status", response_model=SubscriptionStatusResponse)
 async def get_status(
+    req: Request,
     user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
     """Get current subscription status for the authenticated user."""
-    status = await subscription_service.get_subscription_status(db, user.id)
+    status = await subscription_service.get_subscription_status(
+        db, user.id, req.app.state.redis
+    )
     return SubscriptionStatusResponse(**status)
 
 
 @router.post("/verify", response_model=SubscriptionResponse)
 async def verify_subscription(
     request: SubscriptionVerifyRequest,
+    req: Request,
     user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db),
 ):
@@ -37,6 +41,12 @@ async def verify_subscription(
         original_transaction_id=request.original_transaction_id,
         product_id=request.product_id,
     )
+    # Commit before invalidating, or a concurrent status read could cache
+    # the old row again in between
+    await db.commit()
+    await subscription_service.invalidate_subscription_status(
+        req.app.state.redis, user.id
+    )
     return sub
 
 
@@ -41,3 +41,5 @@ class TaskImportResult(BaseModel):
 class TaskImportResponse(BaseModel):
     imported_count: int
     tasks: list[TaskImportResult]
+    # True when the provider had more tasks than a single import returns
+    truncated: bool = False
@@ -0,0 +1,29 @@
+import httpx
+
+_client: httpx.AsyncClient | None = None
+
+
+def get_shared_client() -> httpx.AsyncClient:
+    """Process-wide pooled HTTP client for outbound API calls.
+
+    Created on first use and closed from the app lifespan, so TLS
+    connections to Apple, Google, Slack, Todoist, Notion etc. are reused
+    across requests. HTTP/2 is offered via ALPN so concurrent calls to the
+    same host share a connection; HTTP/1.1-only hosts fall back as usual.
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            timeout=10.0,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
+            http2=True,
+        )
+    return _client
+
+
+async def close_shared_client() -> None:
+    """Close the shared client if it was created."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
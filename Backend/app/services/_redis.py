@@ -0,0 +1,11 @@
+import functools
+
+
+@functools.lru_cache(maxsize=16)
+def get_script(redis_client, source: str):
+    """The client's registered Script for a Lua source, created on first use.
+
+    register_script hashes the source into a new Script object each call;
+    reusing one keeps its SHA, so later calls go straight to EVALSHA.
+    """
+    return redis_client.register_script(source)
@@ -5,22 +5,32 @@ using pluggable LLM providers (OpenAI, Anthropic). Falls back to rule-based
 responses when no provider is configured or rate limits are exceeded.
 """
 
-import json
+import asyncio
+import functools
 import logging
+import time
 import uuid
 from abc import ABC, abstractmethod
-from datetime import UTC, date, datetime, timedelta
-
-from sqlalchemy import func, select
+from collections.abc import AsyncIterator
+from contextlib import aclosing, asynccontextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+import orjson
+from sqlalchemy import case, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import settings
 from app.models.session import Session
 from app.models.session_event import SessionEvent
 from app.models.task import Task
+from app.services._redis import get_script
+from app.services.insights_service import get_current_streak
 
 logger = logging.getLogger(__name__)
 
-
 # ---------------------------------------------------------------------------
 # LLM Provider Abstraction
 # ---------------------------------------------------------------------------
@@ -34,6 +44,26 @@ class LLMProvider(ABC):
         """Generate a response from the LLM."""
         ...
 
+    async def generate_stream(
+        self, system_prompt: str, user_prompt: str
+    ) -> AsyncIterator[str]:
+        """Yield the response in chunks as the LLM produces them.
+
+        Providers without native streaming yield the full response once.
+        """
+        yield await self.generate(system_prompt, user_prompt)
+
+    async def generate_json(
+        self, system_prompt: str, user_prompt: str, schema: dict
+    ) -> Any:
+        """Generate a response constrained to a JSON schema, decoded.
+
+        Providers without a structured output mode ask generate() for text
+        and decode the JSON found in it; the schema is only a hint there.
+        Returns None if the response contains no valid JSON.
+        """
+        return _extract_json(await self.generate(system_prompt, user_prompt))
+
 
 class OpenAIProvider(LLMProvider):
     """OpenAI-compatible provider (GPT-4o-mini default)."""
@@ -41,12 +71,18 @@ class OpenAIProvider(LLMProvider):
     def __init__(self, api_key: str, model: str = "gpt-4o-mini"):
         self.api_key = api_key
         self.model = model
+        self._client = None
 
-    async def generate(self, system_prompt: str, user_prompt: str) -> str:
-        from openai import AsyncOpenAI
+    def _get_client(self):
+        # One SDK client per provider keeps its connection pool warm
+        if self._client is None:
+            from openai import AsyncOpenAI
 
-        client = AsyncOpenAI(api_key=self.api_key)
-        response = await client.chat.completions.create(
+            self._client = AsyncOpenAI(api_key=self.api_key)
+        return self._client
+
+    async def generate(self, system_prompt: str, user_prompt: str) -> str:
+        response = await self._get_client().chat.completions.create(
             model=self.model,
             messages=[
                 {"role": "system", "content": system_prompt},
@@ -57,6 +93,41 @@ class OpenAIProvider(LLMProvider):
         )
         return response.choices[0].message.content or ""
 
+    async def generate_stream(
+        self, system_prompt: str, user_prompt: str
+    ) -> AsyncIterator[str]:
+        stream = await self._get_client().chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt},
+            ],
+            max_tokens=500,
+            temperature=0.7,
+            stream=True,
+        )
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+    async def generate_json(
+        self, system_prompt: str, user_prompt: str, schema: dict
+    ) -> Any:
+        response = await self._get_client().chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt},
+            ],
+            max_tokens=500,
+            temperature=0.7,
+            response_format={
+                "type": "json_schema",
+                "json_schema": {"name": "response", "schema": schema, "strict": True},
+            },
+        )
+        return orjson.loads(response.choices[0].message.content or "null")
+
 
 class AnthropicProvider(LLMProvider):
     """Anthropic-compatible provider (Claude Sonnet default)."""
@@ -64,12 +135,18 @@ class AnthropicProvider(LLMProvider):
     def __init__(self, api_key: str, model: str = "claude-sonnet-4-6"):
         self.api_key = api_key
         self.model = model
+        self._client = None
 
-    async def generate(self, system_prompt: str, user_prompt: str) -> str:
-        from anthropic import AsyncAnthropic
+    def _get_client(self):
+        # One SDK client per provider keeps its connection pool warm
+        if self._client is None:
+            from anthropic import AsyncAnthropic
+
+            self._client = AsyncAnthropic(api_key=self.api_key)
+        return self._client
 
-        client = AsyncAnthropic(api_key=self.api_key)
-        response = await client.messages.create(
+    async def generate(self, system_prompt: str, user_prompt: str) -> str:
+        response = await self._get_client().messages.create(
             model=self.model,
             max_tokens=500,
             system=system_prompt,
@@ -77,19 +154,59 @@ class AnthropicProvider(LLMProvider):
         )
         return response.content[0].text
 
+    async def generate_stream(
+        self, system_prompt: str, user_prompt: str
+    ) -> AsyncIterator[str]:
+        async with self._get_client().messages.stream(
+            model=self.model,
+            max_tokens=500,
+            system=system_prompt,
+            messages=[{"role": "user", "content": user_prompt}],
+        ) as stream:
+            async for text in stream.text_stream:
+                yield text
+
+    async def generate_json(
+        self, system_prompt: str, user_prompt: str, schema: dict
+    ) -> Any:
+        # Forcing a single tool call makes the model answer with tool input
+        # that matches the schema instead of free text
+        response = await self._get_client().messages.create(
+            model=self.model,
+            max_tokens=500,
+            system=system_prompt,
+            messages=[{"role": "user", "content": user_prompt}],
+            tools=[{"name": "respond", "input_schema": schema}],
+            tool_choice={"type": "tool", "name": "respond"},
+        )
+        for block in response.content:
+            if block.type == "tool_use":
+                return block.input
+        return None
+
 
 def create_provider(settings) -> LLMProvider | None:
-    """Factory: create the configured LLM provider, or None if unconfigured."""
-    if settings.AI_PROVIDER == "openai" and settings.OPENAI_API_KEY:
-        return OpenAIProvider(
-            settings.OPENAI_API_KEY,
-            settings.AI_MODEL or "gpt-4o-mini",
-        )
-    elif settings.AI_PROVIDER == "anthropic" and settings.ANTHROPIC_API_KEY:
-        return AnthropicProvider(
-            settings.ANTHROPIC_API_KEY,
-            settings.AI_MODEL or "claude-sonnet-4-6",
-        )
+    """Factory: create the configured LLM provider, or None if unconfigured.
+
+    Providers are reused while the configuration is unchanged, so requests
+    share one SDK client and its connections.
+    """
+    return _cached_provider(
+        settings.AI_PROVIDER,
+        settings.AI_MODEL,
+        settings.OPENAI_API_KEY,
+        settings.ANTHROPIC_API_KEY,
+    )
+
+
+@functools.lru_cache(maxsize=4)
+def _cached_provider(
+    provider: str, model: str, openai_api_key: str, anthropic_api_key: str
+) -> LLMProvider | None:
+    if provider == "openai" and openai_api_key:
+        return OpenAIProvider(openai_api_key, model or "gpt-4o-mini")
+    elif provider == "anthropic" and anthropic_api_key:
+        return AnthropicProvider(anthropic_api_key, model or "claude-sonnet-4-6")
     return None
 
 
@@ -127,10 +244,33 @@ COACHING_NUDGE_USER = (
 
 GOAL_SUGGESTION_PROMPT = (
     "You are a productivity coach. Suggest 3 specific, achievable goals "
-    "for this week based on the user's history. Format as a JSON array: "
-    '[{{"goal": "...", "target": "...", "reasoning": "..."}}]'
+    "for this week based on the user's history. Format as a JSON object: "
+    '{"goals": [{"goal": "...", "target": "...", "reasoning": "..."}]}'
 )
 
+# Structured-output schema for goal suggestions. Strict JSON-schema modes
+# need an object at the root, so the array is wrapped in "goals".
+GOALS_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "goals": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "goal": {"type": "string"},
+                    "target": {"type": "string"},
+                    "reasoning": {"type": "string"},
+                },
+                "required": ["goal", "target", "reasoning"],
+                "additionalProperties": False,
+            },
+        }
+    },
+    "required": ["goals"],
+    "additionalProperties": False,
+}
+
 GOAL_SUGGESTION_USER = (
     "Recent performance:\n"
     "- Avg daily focus: {avg_daily_focus_min} minutes\n"
@@ -140,20 +280,259 @@ GOAL_SUGGESTION_USER = (
 )
 
 
+# Caps concurrent provider calls across all AI endpoints in this process;
+# callers beyond the cap wait for a slot rather than piling onto the API
+_provider_slots = asyncio.Semaphore(settings.AI_MAX_CONCURRENCY)
+
+
+async def bounded_generate(
+    provider: LLMProvider,
+    system_prompt: str,
+    user_prompt: str,
+    schema: dict | None = None,
+) -> Any:
+    """Call provider.generate under the shared concurrency cap and timeout.
+
+    With a schema, calls provider.generate_json instead and returns the
+    decoded JSON. Raises TimeoutError if waiting for a slot plus the call
+    takes longer than AI_TIMEOUT_SECONDS.
+    """
+    async with asyncio.timeout(settings.AI_TIMEOUT_SECONDS):
+        async with _provider_slots:
+            if schema is not None:
+                return await provider.generate_json(system_prompt, user_prompt, schema)
+            return await provider.generate(system_prompt, user_prompt)
+
+
+async def bounded_stream(
+    provider: LLMProvider, system_prompt: str, user_prompt: str
+) -> AsyncIterator[str]:
+    """Yield provider.generate_stream chunks under the shared concurrency cap.
+
+    Waiting for a slot and each wait for the next chunk are limited to
+    AI_TIMEOUT_SECONDS. The whole stream, including time the consumer spends
+    between reads, is limited to AI_STREAM_TIMEOUT_SECONDS, so a stalled
+    provider or slow reader can't hold a slot indefinitely. Raises
+    TimeoutError when either limit is hit.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + settings.AI_STREAM_TIMEOUT_SECONDS
+    async with asyncio.timeout(settings.AI_TIMEOUT_SECONDS):
+        await _provider_slots.acquire()
+    try:
+        stream = provider.generate_stream(system_prompt, user_prompt)
+        async with aclosing(stream):
+            while True:
+                idle_deadline = loop.time() + settings.AI_TIMEOUT_SECONDS
+                async with asyncio.timeout_at(min(deadline, idle_deadline)):
+                    try:
+                        chunk = await anext(stream)
+                    except StopAsyncIteration:
+                        return
+                yield chunk
+    finally:
+        _provider_slots.release()
+
+
 # ---------------------------------------------------------------------------
 # Rate Limiting
 # ---------------------------------------------------------------------------
 
 
+AI_RATE_WINDOW_SECONDS = 86400
+
+
+def _rate_limit_key(user_id: uuid.UUID) -> str:
+    return f"ai_rate:{user_id}"
+
+
+# Approximate sliding window: the hash keeps the current window's start (w)
+# and count (c) plus the previous window's count (p). The previous count is
+# weighted by how much of it still overlaps the trailing window, so there is
+# no burst allowance at window boundaries. Every call is counted; the slot
+# refunds ones that end up unused.
+AI_RATE_LIMIT_LUA = """
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local start = now - (now % window)
+local state = redis.call('HMGET', KEYS[1], 'w', 'c', 'p')
+local w = tonumber(state[1]) or start
+local c = tonumber(state[2]) or 0
+local p = tonumber(state[3]) or 0
+if start > w then
+    if start - w == window then p = c else p = 0 end
+    c = 0
+end
+c = c + 1
+redis.call('HSET', KEYS[1], 'w', start, 'c', c, 'p', p)
+redis.call('EXPIRE', KEYS[1], window * 2)
+local weighted = p * (window - (now % window)) / window + c
+if weighted <= tonumber(ARGV[3]) then
+    return 1
+end
+return 0
+"""
+
+# Takes back one call counted in the window starting at ARGV[1]. If the
+# window has rolled over since, that call now sits in the previous count;
+# if it is older still, there is nothing left to refund.
+AI_RATE_REFUND_LUA = """
+local counted = tonumber(ARGV[1])
+local w = tonumber(redis.call('HGET', KEYS[1], 'w'))
+if w == counted then
+    redis.call('HINCRBY', KEYS[1], 'c', -1)
+    return 1
+elseif w == counted + tonumber(ARGV[2]) then
+    redis.call('HINCRBY', KEYS[1], 'p', -1)
+    return 1
+end
+return 0
+"""
+
+
 async def _check_rate_limit(
-    redis_client, user_id: uuid.UUID, limit: int = 20
+    redis_client, user_id: uuid.UUID, limit: int = 20, now: int | None = None
 ) -> bool:
-    """Check and increment daily rate limit. Returns True if within limit."""
-    key = f"ai_rate:{user_id}:{date.today().isoformat()}"
-    count = await redis_client.incr(key)
-    if count == 1:
-        await redis_client.expire(key, 86400)
-    return count <= limit
+    """Count a call against the trailing-day limit. Returns True if within it."""
+    if now is None:
+        now = int(time.time())
+    script = get_script(redis_client, AI_RATE_LIMIT_LUA)
+    allowed = await script(
+        keys=[_rate_limit_key(user_id)],
+        args=[now, AI_RATE_WINDOW_SECONDS, limit],
+    )
+    return allowed == 1
+
+
+async def _refund_rate_limit(
+    redis_client, user_id: uuid.UUID, window_start: int
+) -> None:
+    """Take back a call counted in the window starting at window_start."""
+    script = get_script(redis_client, AI_RATE_REFUND_LUA)
+    await script(
+        keys=[_rate_limit_key(user_id)],
+        args=[window_start, AI_RATE_WINDOW_SECONDS],
+    )
+
+
+@dataclass
+class _RateSlot:
+    """A reservation against a user's daily AI quota."""
+
+    user_id: uuid.UUID
+    allowed: bool
+    used: bool = False
+    # Start of the rate-limit window the call was counted in
+    window_start: int = 0
+
+
+_current_rate_slot: ContextVar[_RateSlot | None] = ContextVar(
+    "ai_rate_slot", default=None
+)
+
+
+@asynccontextmanager
+async def _rate_slot(
+    redis_client, user_id: uuid.UUID, limit: int = 20
+) -> AsyncIterator[_RateSlot]:
+    """Reserve one LLM call from the user's daily quota for the enclosed block.
+
+    The reservation is refunded on exit unless the block marks the slot as
+    used, so requests that end up on the rule-based fallback don't count
+    against the user. Slots opened inside an existing slot for the same user
+    reuse it instead of incrementing the counter again.
+    """
+    outer = _current_rate_slot.get()
+    if outer is not None and outer.user_id == user_id:
+        yield outer
+        return
+
+    if redis_client is None:
+        slot = _RateSlot(user_id=user_id, allowed=True)
+    else:
+        now = int(time.time())
+        allowed = await _check_rate_limit(redis_client, user_id, limit, now)
+        slot = _RateSlot(
+            user_id=user_id,
+            allowed=allowed,
+            window_start=now - now % AI_RATE_WINDOW_SECONDS,
+        )
+
+    token = _current_rate_slot.set(slot)
+    try:
+        yield slot
+    finally:
+        _current_rate_slot.reset(token)
+        if redis_client is not None and not slot.used:
+            await _refund_rate_limit(redis_client, user_id, slot.window_start)
+
+
+# ---------------------------------------------------------------------------
+# Stale-While-Revalidate Cache
+# ---------------------------------------------------------------------------
+
+# Nudges and goals stay servable past their freshness window; a stale read is
+# answered from cache while one worker regenerates it in the background
+NUDGE_FRESH_SECONDS = 3600
+NUDGE_STALE_SECONDS = 86400
+GOALS_FRESH_SECONDS = 86400
+GOALS_STALE_SECONDS = 7 * 86400
+REFRESH_LOCK_SECONDS = 30
+
+_background_refreshes: set[asyncio.Task] = set()
+
+
+async def _swr_get(redis_client, key: str) -> tuple[object, bool] | None:
+    """Read a cached value as (value, is_stale), or None on a miss."""
+    raw = await redis_client.get(key)
+    if raw is None:
+        return None
+    try:
+        entry = orjson.loads(raw)
+        return entry["value"], entry["fresh_until"] <= time.time()
+    except (orjson.JSONDecodeError, TypeError, KeyError):
+        return None
+
+
+async def _swr_set(
+    redis_client, key: str, value, fresh_seconds: int, stale_seconds: int
+) -> None:
+    entry = {"value": value, "fresh_until": time.time() + fresh_seconds}
+    await redis_client.set(key, orjson.dumps(entry), ex=stale_seconds)
+
+
+async def _claim_refresh(redis_client, key: str) -> bool:
+    """Take the refresh lock for a stale key; only one caller wins it."""
+    return bool(
+        await redis_client.set(
+            f"{key}:refresh_lock", "1", ex=REFRESH_LOCK_SECONDS, nx=True
+        )
+    )
+
+
+def _spawn_refresh(redis_client, key: str, refresh) -> None:
+    """Run a cache refresh in the background, releasing its lock when done."""
+
+    async def run() -> None:
+        try:
+            await refresh
+        except Exception:
+            # Nobody awaits this task; the stale value stays cached
+            logger.exception("Background refresh of %s failed", key)
+        finally:
+            await redis_client.delete(f"{key}:refresh_lock")
+
+    task = asyncio.create_task(run())
+    _background_refreshes.add(task)
+    task.add_done_callback(_background_refreshes.discard)
+
+
+async def cancel_background_refreshes() -> None:
+    """Cancel pending cache refreshes and wait for them to unwind."""
+    tasks = list(_background_refreshes)
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
 
 
 # ---------------------------------------------------------------------------
@@ -165,26 +544,28 @@ async def _get_session_data(
     db: AsyncSession, user_id: uuid.UUID, session_id: uuid.UUID
 ) -> dict | None:
     """Fetch session data for summary generation."""
+    # Completed tasks (status=2) inside the session window, counted in the
+    # same query as the session lookup
+    tasks_completed = (
+        select(func.count(Task.id))
+        .where(
+            Task.user_id == Session.user_id,
+            Task.status == 2,
+            Task.updated_at >= Session.start_time,
+            Task.updated_at <= func.coalesce(Session.end_time, datetime.now(UTC)),
+        )
+        .scalar_subquery()
+    )
     result = await db.execute(
-        select(Session).where(
+        select(Session, tasks_completed).where(
             Session.id == session_id,
             Session.user_id == user_id,
         )
     )
-    session = result.scalar_one_or_none()
-    if session is None:
+    row = result.one_or_none()
+    if row is None:
         return None
-
-    # Count completed tasks during this session (status=2 means done)
-    tasks_result = await db.execute(
-        select(func.count(Task.id)).where(
-            Task.user_id == user_id,
-            Task.status == 2,
-            Task.updated_at >= session.start_time,
-            Task.updated_at <= (session.end_time or datetime.now(UTC)),
-        )
-    )
-    tasks_completed = tasks_result.scalar() or 0
+    session, tasks_completed = row
 
     duration_seconds = session.duration_seconds or 0
     focused_seconds = session.focused_seconds or 0
@@ -204,15 +585,15 @@ async def _get_user_patterns(db: AsyncSession, user_id: uuid.UUID) -> dict:
     now = datetime.now(UTC)
     start = now - timedelta(days=14)
 
-    # Recent sessions
+    # Recent sessions; only the two columns used below, as plain tuples
     result = await db.execute(
-        select(Session).where(
+        select(Session.start_time, Session.focused_seconds).where(
             Session.user_id == user_id,
             Session.is_complete == True,  # noqa: E712
             Session.start_time >= start,
         )
     )
-    sessions = result.scalars().all()
+    sessions = result.all()
 
     if not sessions:
         return {
@@ -224,19 +605,19 @@ async def _get_user_patterns(db: AsyncSession, user_id: uuid.UUID) -> dict:
 
     # Average daily focus
     days_span = max((now - start).days, 1)
-    total_focused = sum(s.focused_seconds for s in sessions)
+    total_focused = sum(focused for _, focused in sessions)
     avg_daily_focus_min = round(total_focused / days_span / 60, 1)
 
     # Peak hour (hour with most focused seconds)
     hour_focus: dict[int, int] = {}
-    for s in sessions:
-        hour = s.start_time.hour
-        hour_focus[hour] = hour_focus.get(hour, 0) + s.focused_seconds
+    for start_time, focused in sessions:
+        hour_focus[start_time.hour] = hour_focus.get(start_time.hour, 0) + focused
     peak_hour = max(hour_focus, key=hour_focus.get) if hour_focus else 9
 
     # Top distractor
+    cnt = func.count().label("cnt")
     distraction_result = await db.execute(
-        select(SessionEvent.app_name, func.count(SessionEvent.id).label("cnt"))
+        select(SessionEvent.app_name, cnt)
         .join(Session, Session.id == SessionEvent.session_id)
         .where(
             Session.user_id == user_id,
@@ -245,25 +626,13 @@ async def _get_user_patterns(db: AsyncSession, user_id: uuid.UUID) -> dict:
             SessionEvent.app_name.isnot(None),
         )
         .group_by(SessionEvent.app_name)
-        .order_by(func.count(SessionEvent.id).desc())
+        .order_by(cnt.desc())
         .limit(1)
     )
     top_row = distraction_result.first()
     top_distractor = top_row.app_name if top_row else "none"
 
-    # Streak calculation
-    date_expr = func.date(Session.start_time)
-    streak_result = await db.execute(
-        select(date_expr.label("session_date"))
-        .where(
-            Session.user_id == user_id,
-            Session.is_complete == True,  # noqa: E712
-        )
-        .group_by(date_expr)
-        .order_by(date_expr.desc())
-    )
-    raw_dates = [row.session_date for row in streak_result.all()]
-    streak_days = _calculate_streak(raw_dates)
+    streak_days = await get_current_streak(db, user_id)
 
     return {
         "avg_daily_focus_min": avg_daily_focus_min,
@@ -274,20 +643,51 @@ async def _get_user_patterns(db: AsyncSession, user_id: uuid.UUID) -> dict:
 
 
 async def _get_trend_data(db: AsyncSession, user_id: uuid.UUID) -> dict:
-    """Gather trend data for goal suggestions."""
+    """Gather trend data for goal suggestions.
+
+    Totals and the week-over-week distraction split are aggregated in one
+    SQL query, so no session rows are loaded into Python.
+    """
     now = datetime.now(UTC)
     start = now - timedelta(days=14)
+    midpoint = now - timedelta(days=7)
 
     result = await db.execute(
-        select(Session).where(
+        select(
+            func.count(Session.id).label("session_count"),
+            func.coalesce(func.sum(Session.focused_seconds), 0).label(
+                "focused_seconds"
+            ),
+            func.coalesce(func.sum(Session.duration_seconds), 0).label(
+                "duration_seconds"
+            ),
+            func.coalesce(
+                func.sum(
+                    case(
+                        (Session.start_time < midpoint, Session.distraction_count),
+                        else_=0,
+                    )
+                ),
+                0,
+            ).label("week1_distractions"),
+            func.coalesce(
+                func.sum(
+                    case(
+                        (Session.start_time >= midpoint, Session.distraction_count),
+                        else_=0,
+                    )
+                ),
+                0,
+            ).label("week2_distractions"),
+        ).where(
             Session.user_id == user_id,
             Session.is_complete == True,  # noqa: E712
             Session.start_time >= start,
         )
     )
-    sessions = result.scalars().all()
+    row = result.one()
 
-    if not sessions:
+    if row.session_count == 0:
         return {
             "avg_daily_focus_min": 0,
             "avg_sessions_per_day": 0.0,
@@ -296,26 +696,13 @@ async def _get_trend_data(db: AsyncSession, user_id: uuid.UUID) -> dict:
         }
 
     days_span = max((now - start).days, 1)
-    total_focused = sum(s.focused_seconds for s in sessions)
-    total_duration = sum(s.duration_seconds for s in sessions)
+    total_focused = row.focused_seconds
+    total_duration = row.duration_seconds
     avg_focus_ratio = total_focused / total_duration if total_duration > 0 else 0.0
 
     # Compare first vs second week distractions for trend
-    midpoint = now - timedelta(days=7)
-    # Normalize: SQLite may return naive datetimes, Postgres returns aware
-    midpoint_naive = midpoint.replace(tzinfo=None)
-    week1_distractions = sum(
-        s.distraction_count
-        for s in sessions
-        if (s.start_time.replace(tzinfo=None) if s.start_time.tzinfo else s.start_time)
-        < midpoint_naive
-    )
-    week2_distractions = sum(
-        s.distraction_count
-        for s in sessions
-        if (s.start_time.replace(tzinfo=None) if s.start_time.tzinfo else s.start_time)
-        >= midpoint_naive
-    )
+    week1_distractions = row.week1_distractions
+    week2_distractions = row.week2_distractions
 
     if week1_distractions == 0 and week2_distractions == 0:
         distraction_trend = "stable"
@@ -328,38 +715,12 @@ async def _get_trend_data(db: AsyncSession, user_id: uuid.UUID) -> dict:
 
     return {
         "avg_daily_focus_min": round(total_focused / days_span / 60, 1),
-        "avg_sessions_per_day": round(len(sessions) / days_span, 1),
+        "avg_sessions_per_day": round(row.session_count / days_span, 1),
         "avg_focus_ratio": avg_focus_ratio,
         "distraction_trend": distraction_trend,
     }
 
 
-def _calculate_streak(raw_dates: list) -> int:
-    """Calculate consecutive days with sessions ending at today."""
-    if not raw_dates:
-        return 0
-
-    dates: list[date] = []
-    for d in raw_dates:
-        if isinstance(d, str):
-            dates.append(date.fromisoformat(d))
-        elif isinstance(d, date):
-            dates.append(d)
-
-    today = date.today()
-    streak = 0
-    expected = today
-
-    for d in dates:
-        if d == expected:
-            streak += 1
-            expected -= timedelta(days=1)
-        elif d < expected:
-            break
-
-    return streak
-
-
 # ---------------------------------------------------------------------------
 # Fallback (Rule-Based) Responses
 # ---------------------------------------------------------------------------
@@ -472,6 +833,11 @@ def _fallback_goals(
 # ---------------------------------------------------------------------------
 
 
+def _summary_cache_key(user_id: uuid.UUID, session_id: uuid.UUID) -> str:
+    # Scoped to the owner so a cache hit never needs the ownership query
+    return f"ai_summary:{user_id}:{session_id}"
+
+
 async def generate_session_summary(
     db: AsyncSession,
     user_id: uuid.UUID,
@@ -483,36 +849,35 @@ async def generate_session_summary(
 
     Returns dict with 'summary' and 'is_ai_generated' keys.
     """
+    # A cached summary answers with a single GET: no quota check, no queries
+    cache_key = _summary_cache_key(user_id, session_id)
+    if redis_client:
+        cached = await redis_client.get(cache_key)
+        if cached is not None:
+            return {"summary": cached, "is_ai_generated": True}
+
     session_data = await _get_session_data(db, user_id, session_id)
     if session_data is None:
         return {"summary": "Session not found.", "is_ai_generated": False}
 
-    # Check rate limit
-    if redis_client and not await _check_rate_limit(redis_client, user_id):
-        return {
-            "summary": _fallback_session_summary(
-                session_data["duration_minutes"],
-                session_data["focused_minutes"],
-                session_data["distraction_count"],
-                session_data["tasks_completed"],
-            ),
-            "is_ai_generated": False,
-        }
-
-    # Try LLM generation
+    # Try LLM generation within the user's daily quota
     if provider is not None:
-        try:
-            user_prompt = SESSION_SUMMARY_USER.format(**session_data)
-            summary = await provider.generate(SESSION_SUMMARY_PROMPT, user_prompt)
-
-            # Cache the result
-            if redis_client:
-                cache_key = f"ai_summary:{session_id}"
-                await redis_client.set(cache_key, summary, ex=86400)
-
-            return {"summary": summary, "is_ai_generated": True}
-        except Exception:
-            logger.exception("LLM generation failed for session summary")
+        async with _rate_slot(redis_client, user_id) as slot:
+            if slot.allowed:
+                try:
+                    user_prompt = SESSION_SUMMARY_USER.format(**session_data)
+                    summary = await bounded_generate(
+                        provider, SESSION_SUMMARY_PROMPT, user_prompt
+                    )
+                    slot.used = True
+
+                    # Cache the result
+                    if redis_client:
+                        await redis_client.set(cache_key, summary, ex=86400)
+
+                    return {"summary": summary, "is_ai_generated": True}
+                except Exception:
+                    logger.exception("LLM generation failed for session summary")
 
     # Fallback
     return {
@@ -526,50 +891,97 @@ async def generate_session_summary(
     }
 
 
-async def generate_coaching_nudge(
+async def generate_session_summary_stream(
     db: AsyncSession,
     user_id: uuid.UUID,
+    session_id: uuid.UUID,
     provider: LLMProvider | None,
     redis_client=None,
-) -> dict:
-    """Generate a coaching nudge based on recent patterns.
+) -> AsyncIterator[str]:
+    """Stream the AI summary for a completed session as it is generated.
 
-    Returns dict with 'nudge' and 'is_ai_generated' keys.
-    Caches results for 1 hour.
+    Yields text chunks; the full summary is cached once the stream completes.
+    Falls back to the rule-based summary if the LLM fails before producing
+    any output.
     """
-    # Check cache (1hr TTL)
+    cache_key = _summary_cache_key(user_id, session_id)
     if redis_client:
-        cache_key = f"ai_nudge:{user_id}"
         cached = await redis_client.get(cache_key)
-        if cached:
-            return {"nudge": cached, "is_ai_generated": True}
+        if cached is not None:
+            yield cached
+            return
 
-    patterns = await _get_user_patterns(db, user_id)
-
-    # Check rate limit
-    if redis_client and not await _check_rate_limit(redis_client, user_id):
-        return {
-            "nudge": _fallback_nudge(
-                patterns["avg_daily_focus_min"],
-                patterns["peak_hour"],
-                patterns["top_distractor"],
-            ),
-            "is_ai_generated": False,
-        }
+    session_data = await _get_session_data(db, user_id, session_id)
+    if session_data is None:
+        yield "Session not found."
+        return
 
-    # Try LLM generation
     if provider is not None:
-        try:
-            user_prompt = COACHING_NUDGE_USER.format(**patterns)
-            nudge = await provider.generate(COACHING_NUDGE_PROMPT, user_prompt)
+        async with _rate_slot(redis_client, user_id) as slot:
+            if slot.allowed:
+                chunks: list[str] = []
+                completed = False
+                try:
+                    user_prompt = SESSION_SUMMARY_USER.format(**session_data)
+                    stream = bounded_stream(
+                        provider, SESSION_SUMMARY_PROMPT, user_prompt
+                    )
+                    async with aclosing(stream):
+                        async for chunk in stream:
+                            slot.used = True
+                            chunks.append(chunk)
+                            yield chunk
+                    completed = True
+                except Exception:
+                    logger.exception("LLM streaming failed for session summary")
+
+                if chunks:
+                    # Partial output has already been sent; only cache it if
+                    # the stream finished cleanly.
+                    if redis_client and completed:
+                        await redis_client.set(cache_key, "".join(chunks), ex=86400)
+                    return
+
+    yield _fallback_session_summary(
+        session_data["duration_minutes"],
+        session_data["focused_minutes"],
+        session_data["distraction_count"],
+        session_data["tasks_completed"],
+    )
 
-            # Cache for 1 hour
-            if redis_client:
-                await redis_client.set(cache_key, nudge, ex=3600)
 
+async def generate_coaching_nudge(
+    db: AsyncSession,
+    user_id: uuid.UUID,
+    provider: LLMProvider | None,
+    redis_client=None,
+) -> dict:
+    """Generate a coaching nudge based on recent patterns.
+
+    Returns dict with 'nudge' and 'is_ai_generated' keys.
+    Cached nudges are fresh for 1 hour and refreshed in the background after.
+    """
+    cache_key = f"ai_nudge:{user_id}"
+    if redis_client:
+        cached = await _swr_get(redis_client, cache_key)
+        if cached is not None:
+            nudge, stale = cached
+            if stale and provider is not None and await _claim_refresh(
+                redis_client, cache_key
+            ):
+                patterns = await _get_user_patterns(db, user_id)
+                _spawn_refresh(
+                    redis_client,
+                    cache_key,
+                    _llm_nudge(user_id, patterns, provider, redis_client),
+                )
             return {"nudge": nudge, "is_ai_generated": True}
-        except Exception:
-            logger.exception("LLM generation failed for coaching nudge")
+
+    patterns = await _get_user_patterns(db, user_id)
+
+    nudge = await _llm_nudge(user_id, patterns, provider, redis_client)
+    if nudge is not None:
+        return {"nudge": nudge, "is_ai_generated": True}
 
     # Fallback
     return {
@@ -582,6 +994,36 @@ async def generate_coaching_nudge(
     }
 
 
+async def _llm_nudge(
+    user_id: uuid.UUID, patterns: dict, provider: LLMProvider | None, redis_client
+) -> str | None:
+    """Generate and cache a nudge within the user's daily quota."""
+    if provider is None:
+        return None
+    async with _rate_slot(redis_client, user_id) as slot:
+        if not slot.allowed:
+            return None
+        try:
+            user_prompt = COACHING_NUDGE_USER.format(**patterns)
+            nudge = await bounded_generate(
+                provider, COACHING_NUDGE_PROMPT, user_prompt
+            )
+            slot.used = True
+        except Exception:
+            logger.exception("LLM generation failed for coaching nudge")
+            return None
+
+    if redis_client:
+        await _swr_set(
+            redis_client,
+            f"ai_nudge:{user_id}",
+            nudge,
+            NUDGE_FRESH_SECONDS,
+            NUDGE_STALE_SECONDS,
+        )
+    return nudge
+
+
 async def generate_goal_suggestions(
     db: AsyncSession,
     user_id: uuid.UUID,
@@ -591,48 +1033,29 @@ async def generate_goal_suggestions(
     """Generate AI-powered goal suggestions.
 
     Returns dict with 'goals' list and 'is_ai_generated' key.
-    Caches results for 24 hours.
+    Cached goals are fresh for 24 hours and refreshed in the background after.
     """
-    # Check cache (24hr TTL)
+    cache_key = f"ai_goals:{user_id}"
     if redis_client:
-        cache_key = f"ai_goals:{user_id}"
-        cached = await redis_client.get(cache_key)
-        if cached:
-            try:
-                goals = json.loads(cached)
-                return {"goals": goals, "is_ai_generated": True}
-            except json.JSONDecodeError:
-                pass
+        cached = await _swr_get(redis_client, cache_key)
+        if cached is not None:
+            goals, stale = cached
+            if stale and provider is not None and await _claim_refresh(
+                redis_client, cache_key
+            ):
+                trend_data = await _get_trend_data(db, user_id)
+                _spawn_refresh(
+                    redis_client,
+                    cache_key,
+                    _llm_goals(user_id, trend_data, provider, redis_client),
+                )
+            return {"goals": goals, "is_ai_generated": True}
 
     trend_data = await _get_trend_data(db, user_id)
 
-    # Check rate limit
-    if redis_client and not await _check_rate_limit(redis_client, user_id):
-        return {
-            "goals": _fallback_goals(
-                trend_data["avg_daily_focus_min"],
-                trend_data["avg_sessions_per_day"],
-                trend_data["avg_focus_ratio"],
-            ),
-            "is_ai_generated": False,
-        }
-
-    # Try LLM generation
-    if provider is not None:
-        try:
-            user_prompt = GOAL_SUGGESTION_USER.format(**trend_data)
-            raw = await provider.generate(GOAL_SUGGESTION_PROMPT, user_prompt)
-
-            # Parse JSON from LLM response
-            goals = _parse_goals_json(raw)
-            if goals:
-                # Cache for 24 hours
-                if redis_client:
-                    await redis_client.set(cache_key, json.dumps(goals), ex=86400)
-
-                return {"goals": goals, "is_ai_generated": True}
-        except Exception:
-            logger.exception("LLM generation failed for goal suggestions")
+    goals = await _llm_goals(user_id, trend_data, provider, redis_client)
+    if goals is not None:
+        return {"goals": goals, "is_ai_generated": True}
 
     # Fallback
     return {
@@ -645,30 +1068,73 @@ async def generate_goal_suggestions(
     }
 
 
-def _parse_goals_json(raw: str) -> list[dict] | None:
-    """Extract a JSON array of goals from LLM response text."""
+async def _llm_goals(
+    user_id: uuid.UUID, trend_data: dict, provider: LLMProvider | None, redis_client
+) -> list[dict] | None:
+    """Generate and cache goal suggestions within the user's daily quota."""
+    if provider is None:
+        return None
+    async with _rate_slot(redis_client, user_id) as slot:
+        if not slot.allowed:
+            return None
+        try:
+            user_prompt = GOAL_SUGGESTION_USER.format(**trend_data)
+            data = await bounded_generate(
+                provider, GOAL_SUGGESTION_PROMPT, user_prompt, GOALS_SCHEMA
+            )
+            slot.used = True
+        except Exception:
+            logger.exception("LLM generation failed for goal suggestions")
+            return None
+
+    goals = _goals_from_json(data)
+    if goals and redis_client:
+        await _swr_set(
+            redis_client,
+            f"ai_goals:{user_id}",
+            goals,
+            GOALS_FRESH_SECONDS,
+            GOALS_STALE_SECONDS,
+        )
+    return goals
+
+
+def _extract_json(raw: str) -> Any:
+    """Decode the JSON value in LLM response text, or None if there is none.
+
+    Handles bare JSON as well as JSON wrapped in markdown code blocks or
+    surrounding text.
+    """
+    # Without a brace or bracket there is no JSON to find
+    starts = [i for i in (raw.find("{"), raw.find("[")) if i != -1]
+    if not starts:
+        return None
+
     # Try direct parse first
     try:
-        parsed = json.loads(raw)
-        if isinstance(parsed, list):
-            return _validate_goals(parsed)
-    except json.JSONDecodeError:
+        return orjson.loads(raw)
+    except orjson.JSONDecodeError:
         pass
 
     # Try extracting JSON from markdown code blocks or surrounding text
-    start = raw.find("[")
-    end = raw.rfind("]")
-    if start != -1 and end != -1 and end > start:
+    start = min(starts)
+    end = raw.rfind("}" if raw[start] == "{" else "]")
+    if end > start:
         try:
-            parsed = json.loads(raw[start : end + 1])
-            if isinstance(parsed, list):
-                return _validate_goals(parsed)
-        except json.JSONDecodeError:
+            return orjson.loads(raw[start : end + 1])
+        except orjson.JSONDecodeError:
             pass
 
     return None
 
 
+def _goals_from_json(data: Any) -> list[dict] | None:
+    """Validate decoded goals, given as {"goals": [...]} or a bare array."""
+    if isinstance(data, dict):
+        data = data.get("goals")
+    return _validate_goals(data) if isinstance(data, list) else None
+
+
 def _validate_goals(goals: list) -> list[dict]:
     """Ensure each goal dict has the required keys."""
     validated = []
@@ -1,19 +1,31 @@
+import asyncio
+import hashlib
+import math
+import re
+import time
 import uuid
+from collections import OrderedDict
 from datetime import datetime, timedelta, timezone
+from typing import Any
 
 import bcrypt
 import httpx
-from jose import jwt
-from sqlalchemy import select
+import jwt
+from jwt import PyJWK, PyJWTError
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import settings
 from app.models.user import User
+from app.services._http import get_shared_client
 
 
 def hash_password(password: str) -> str:
     """Hash a password using bcrypt."""
-    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
+    salt = bcrypt.gensalt(rounds=settings.BCRYPT_ROUNDS)
+    return bcrypt.hashpw(password.encode("utf-8"), salt).decode("utf-8")
 
 
 def verify_password(password: str, hashed: str) -> bool:
@@ -24,29 +36,103 @@ def verify_password(password: str, hashed: str) -> bool:
 APPLE_JWKS_URL = "https://appleid.apple.com/auth/keys"
 APPLE_ISSUER = "https://appleid.apple.com"
 
-# Google token info endpoint
-GOOGLE_TOKENINFO_URL = "https://oauth2.googleapis.com/tokeninfo"
+# Google JWKS endpoint
+GOOGLE_JWKS_URL = "https://www.googleapis.com/oauth2/v3/certs"
+GOOGLE_ISSUERS = ["https://accounts.google.com", "accounts.google.com"]
+
+# Used when the JWKS response carries no Cache-Control max-age
+DEFAULT_JWKS_TTL_SECONDS = 3600
+# Unknown kids trigger a refetch (key rotation), but no more often than this,
+# so tokens with made-up kids can't turn into a stream of JWKS downloads.
+JWKS_MIN_REFRESH_SECONDS = 30
+
+# Revoked refresh tokens are tracked in Bloom filters built on plain Redis
+# bitmaps, one per token-expiry day, so a revocation costs a few bits rather
+# than a whole key and each bitmap expires with the last token it covers.
+# A false positive forces the client to sign in again, so the filters are
+# sized from the expected daily volume for a very low false-positive rate.
+# Redis allocates a bitmap up to its highest set bit, which hashed offsets
+# reach almost at once, so each live expiry day costs REVOKED_REFRESH_BITS / 8
+# bytes (about 35 KiB at the defaults).
+
+
+def _bloom_size(capacity: int, false_positive_rate: float) -> tuple[int, int]:
+    """Optimal bit count and hash count for a Bloom filter."""
+    bits = math.ceil(-capacity * math.log(false_positive_rate) / math.log(2) ** 2)
+    return bits, max(1, round(bits / capacity * math.log(2)))
+
+
+REVOKED_REFRESH_BITS, REVOKED_REFRESH_HASHES = _bloom_size(
+    settings.REVOKED_REFRESH_PER_DAY, settings.REVOKED_REFRESH_FALSE_POSITIVE_RATE
+)
+
+
+def _index_jwks(jwks: dict) -> dict[str, Any]:
+    """Index a JWKS document by kid, constructing each RSA public key once."""
+    return {
+        k["kid"]: PyJWK(k, "RS256").key
+        for k in jwks.get("keys", [])
+        if "kid" in k
+    }
+
+
+_MAX_AGE_RE = re.compile(r"max-age=(\d+)")
+
+
+def _max_age(resp: httpx.Response) -> int | None:
+    """Parse max-age from a response's Cache-Control header."""
+    match = _MAX_AGE_RE.search(resp.headers.get("cache-control", ""))
+    return int(match.group(1)) if match else None
+
+
+class _JWKSCache:
+    """In-process JWKS indexed by kid, refetched on expiry or an unknown kid."""
+
+    def __init__(self, url: str, ttl_seconds: int = DEFAULT_JWKS_TTL_SECONDS):
+        self.url = url
+        self.ttl_seconds = ttl_seconds
+        self._keys: dict[str, Any] = {}
+        self._expires_at = 0.0
+        self._fetched_at = float("-inf")
+        self._lock = asyncio.Lock()
+
+    def _lookup(self, kid: str | None) -> Any | None:
+        if time.monotonic() >= self._expires_at:
+            return None
+        return self._keys.get(kid)
+
+    async def get_key(self, kid: str | None) -> Any | None:
+        key = self._lookup(kid)
+        if key is not None:
+            return key
+
+        async with self._lock:
+            # Another request may have refreshed while we waited
+            key = self._lookup(kid)
+            if key is not None:
+                return key
+
+            now = time.monotonic()
+            if now >= self._expires_at or now - self._fetched_at >= JWKS_MIN_REFRESH_SECONDS:
+                resp = await get_shared_client().get(self.url, timeout=5.0)
+                resp.raise_for_status()
+                self._keys = _index_jwks(resp.json())
+                self._fetched_at = now
+                self._expires_at = now + (_max_age(resp) or self.ttl_seconds)
+            return self._keys.get(kid)
+
+
+_apple_jwks = _JWKSCache(APPLE_JWKS_URL)
+_google_jwks = _JWKSCache(GOOGLE_JWKS_URL)
 
 
 async def verify_apple_token(identity_token: str) -> dict:
     """Verify Apple identity token using JWKS. Returns decoded claims."""
-    async with httpx.AsyncClient() as client:
-        # Fetch Apple's public keys
-        resp = await client.get(APPLE_JWKS_URL)
-        resp.raise_for_status()
-        jwks = resp.json()
-
     # Decode the token header to find the key ID
     unverified_header = jwt.get_unverified_header(identity_token)
     kid = unverified_header.get("kid")
 
-    # Find the matching key
-    key = None
-    for k in jwks.get("keys", []):
-        if k["kid"] == kid:
-            key = k
-            break
-
+    key = await _apple_jwks.get_key(kid)
     if key is None:
         raise ValueError("Apple JWKS key not found")
 
@@ -62,19 +148,28 @@ async def verify_apple_token(identity_token: str) -> dict:
 
 
 async def verify_google_token(identity_token: str) -> dict:
-    """Verify Google identity token using tokeninfo endpoint. Returns claims."""
-    async with httpx.AsyncClient() as client:
-        resp = await client.get(
-            GOOGLE_TOKENINFO_URL,
-            params={"id_token": identity_token},
-        )
-        if resp.status_code != 200:
-            raise ValueError("Invalid Google token")
-        claims = resp.json()
+    """Verify Google identity token using JWKS. Returns decoded claims."""
+    try:
+        kid = jwt.get_unverified_header(identity_token).get("kid")
+    except PyJWTError as exc:
+        raise ValueError("Invalid Google token") from exc
 
-    # Verify audience matches our client ID
-    if settings.GOOGLE_CLIENT_ID and claims.get("aud") != settings.GOOGLE_CLIENT_ID:
-        raise ValueError("Google token audience mismatch")
+    key = await _google_jwks.get_key(kid)
+    if key is None:
+        raise ValueError("Google JWKS key not found")
+
+    try:
+        claims = jwt.decode(
+            identity_token,
+            key,
+            algorithms=["RS256"],
+            audience=settings.GOOGLE_CLIENT_ID or None,
+            issuer=GOOGLE_ISSUERS,
+            # Audience is only enforced once a client ID is configured
+            options={"verify_aud": bool(settings.GOOGLE_CLIENT_ID)},
+        )
+    except PyJWTError as exc:
+        raise ValueError("Invalid Google token") from exc
 
     return claims
 
@@ -86,14 +181,21 @@ async def upsert_user(
     email: str,
     display_name: str | None = None,
 ) -> User:
-    """Create or update user from OAuth provider data."""
-    result = await db.execute(
-        select(User).where(User.auth_provider_id == provider_id)
-    )
-    user = result.scalar_one_or_none()
+    """Create or update user from OAuth provider data.
 
-    if user is None:
-        user = User(
+    A single INSERT ... ON CONFLICT (auth_provider_id) DO UPDATE ... RETURNING
+    statement, so sign-in costs one round-trip whether or not the user exists.
+    """
+    insert = pg_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+
+    # Update fields that may have changed
+    changes = {"updated_at": func.now()}
+    if display_name:
+        changes["display_name"] = display_name
+
+    stmt = (
+        insert(User)
+        .values(
             id=uuid.uuid4(),
             email=email,
             display_name=display_name or email.split("@")[0],
@@ -101,16 +203,13 @@ async def upsert_user(
             auth_provider_id=provider_id,
             settings_json={"visibility": "private"},
         )
-        db.add(user)
-    else:
-        # Update fields that may have changed
-        if display_name:
-            user.display_name = display_name
-        user.updated_at = datetime.now(timezone.utc)
-
-    await db.flush()
-    await db.refresh(user)
-    return user
+        .on_conflict_do_update(index_elements=["auth_provider_id"], set_=changes)
+        .returning(User)
+    )
+    result = await db.execute(
+        stmt, execution_options={"populate_existing": True}
+    )
+    return result.scalar_one()
 
 
 def issue_tokens(user_id: str | uuid.UUID) -> dict:
@@ -142,6 +241,48 @@ def issue_tokens(user_id: str | uuid.UUID) -> dict:
     }
 
 
+# Verified access-token claims keyed by a 128-bit hash of the token. A hit is
+# served without re-checking the signature for TOKEN_CACHE_CREDITS uses, after
+# which the token is verified again; expiry is checked on every hit.
+TOKEN_CACHE_MAX_ENTRIES = 50_000
+TOKEN_CACHE_CREDITS = 16
+_token_cache: OrderedDict[bytes, tuple[dict, int]] = OrderedDict()
+
+
+def decode_access_token(token: str) -> dict:
+    """Verify and decode an access token, reusing recently verified claims.
+
+    Raises PyJWTError if the token is invalid or expired.
+    """
+    key = hashlib.blake2b(token.encode("utf-8"), digest_size=16).digest()
+    cached = _token_cache.get(key)
+    if cached is not None:
+        claims, credits = cached
+        if credits > 0 and claims.get("exp", 0) > time.time():
+            _token_cache[key] = (claims, credits - 1)
+            _token_cache.move_to_end(key)
+            return claims
+        del _token_cache[key]
+
+    claims = jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM])
+    _token_cache[key] = (claims, TOKEN_CACHE_CREDITS)
+    if len(_token_cache) > TOKEN_CACHE_MAX_ENTRIES:
+        _token_cache.popitem(last=False)
+    return claims
+
+
+def _revocation_slots(jti: str, exp: int) -> tuple[str, list[int]]:
+    """Map a refresh token to its revocation bitmap key and Bloom bit offsets."""
+    # Double hashing: two 64-bit halves of one digest derive every offset
+    digest = hashlib.sha256(jti.encode("utf-8")).digest()
+    h1 = int.from_bytes(digest[:8], "big")
+    h2 = int.from_bytes(digest[8:16], "big") | 1
+    offsets = [
+        (h1 + i * h2) % REVOKED_REFRESH_BITS for i in range(REVOKED_REFRESH_HASHES)
+    ]
+    return f"revoked_refresh:{exp // 86400}", offsets
+
+
 async def refresh_tokens(refresh_token: str, redis_client) -> dict:
     """Validate refresh token and issue new pair. Rotate by blacklisting old refresh token."""
     try:
@@ -158,15 +299,19 @@ async def refresh_tokens(refresh_token: str, redis_client) -> dict:
 
     jti = payload.get("jti")
     if jti:
-        # Check if this refresh token has been revoked
-        is_revoked = await redis_client.get(f"revoked_refresh:{jti}")
-        if is_revoked:
+        key, offsets = _revocation_slots(jti, payload["exp"])
+
+        # Revoke the old refresh token until the end of its expiry day. SETBIT
+        # returns each bit's previous value, so the same round-trip tells us
+        # whether the token had already been revoked.
+        pipe = redis_client.pipeline()
+        for offset in offsets:
+            pipe.setbit(key, offset, 1)
+        pipe.expireat(key, (payload["exp"] // 86400 + 1) * 86400)
+        *previous_bits, _ = await pipe.execute()
+        if all(previous_bits):
             raise ValueError("Refresh token has been revoked")
 
-        # Revoke the old refresh token
-        ttl = settings.REFRESH_TOKEN_EXPIRE_DAYS * 86400
-        await redis_client.setex(f"revoked_refresh:{jti}", ttl, "1")
-
     user_id = payload["sub"]
     return issue_tokens(user_id)
 
@@ -178,9 +323,8 @@ async def register_user(
     display_name: str | None = None,
 ) -> User:
     """Register a new user with email/password."""
-    result = await db.execute(select(User).where(User.email == email))
-    existing = result.scalar_one_or_none()
-    if existing:
+    result = await db.execute(select(User.id).where(User.email == email))
+    if result.scalar_one_or_none() is not None:
         raise ValueError("An account with this email already exists")
 
     user = User(
@@ -195,7 +339,6 @@ async def register_user(
     )
     db.add(user)
     await db.flush()
-    await db.refresh(user)
     return user
 
 
@@ -203,18 +346,24 @@ async def login_with_email(
     db: AsyncSession,
     email: str,
     password: str,
-) -> User:
-    """Authenticate user with email/password."""
-    result = await db.execute(select(User).where(User.email == email))
-    user = result.scalar_one_or_none()
+) -> uuid.UUID:
+    """Authenticate user with email/password. Returns the user's ID.
+
+    Only the columns needed to check credentials are loaded; login never
+    mutates the user, so there is no need to hydrate a full ORM entity.
+    """
+    result = await db.execute(
+        select(User.id, User.password_hash).where(User.email == email)
+    )
+    row = result.one_or_none()
 
-    if user is None or user.password_hash is None:
+    if row is None or row.password_hash is None:
         raise ValueError("Invalid email or password")
 
-    if not verify_password(password, user.password_hash):
+    if not verify_password(password, row.password_hash):
         raise ValueError("Invalid email or password")
 
-    return user
+    return row.id
 
 
 def issue_email_verification_token(user_id: str | uuid.UUID) -> str:
@@ -1,5 +1,8 @@
+import asyncio
+import html
 import logging
 from email.message import EmailMessage
+from urllib.parse import urlencode
 
 import aiosmtplib
 
@@ -7,6 +10,61 @@ from app.config import settings
 
 logger = logging.getLogger(__name__)
 
+# A small pool of long-lived SMTP connections, so bursts of mail don't each
+# pay for TCP + STARTTLS + AUTH. An SMTP connection handles one transaction
+# at a time; each send checks one out, and up to SMTP_POOL_SIZE sends run at
+# once. Connections are opened on demand and idle ones are kept for reuse.
+_idle_smtp: list[aiosmtplib.SMTP] = []
+_smtp_slots = asyncio.Semaphore(settings.SMTP_POOL_SIZE)
+
+VERIFY_SUBJECT = "Verify your Tether email"
+VERIFY_HTML = """
+    <h2>Welcome to Tether!</h2>
+    <p>Please verify your email address by clicking the link below:</p>
+    <p><a href="{link}">Verify Email</a></p>
+    <p>This link expires in 24 hours.</p>
+    <p>If you didn't create an account, you can ignore this email.</p>
+    """
+
+RESET_SUBJECT = "Reset your Tether password"
+RESET_HTML = """
+    <h2>Reset your Tether password</h2>
+    <p>Click the link below to reset your password:</p>
+    <p><a href="{link}">Reset Password</a></p>
+    <p>This link expires in 1 hour.</p>
+    <p>If you didn't request this, you can ignore this email.</p>
+    """
+
+
+def _render_link(template: str, path: str, token: str) -> str:
+    """Fill a body template with a frontend link carrying the token."""
+    link = f"{settings.FRONTEND_URL}/{path}?{urlencode({'token': token})}"
+    return template.format(link=html.escape(link))
+
+
+async def _connect_smtp() -> aiosmtplib.SMTP:
+    """Open (and log in on) a new SMTP connection."""
+    smtp = aiosmtplib.SMTP(
+        hostname=settings.SMTP_HOST,
+        port=settings.SMTP_PORT,
+        username=settings.SMTP_USERNAME or None,
+        password=settings.SMTP_PASSWORD or None,
+        start_tls=True,
+    )
+    await smtp.connect()
+    return smtp
+
+
+async def close_smtp() -> None:
+    """Close the pooled SMTP connections."""
+    while _idle_smtp:
+        smtp = _idle_smtp.pop()
+        if smtp.is_connected:
+            try:
+                await smtp.quit()
+            except aiosmtplib.SMTPException:
+                smtp.close()
+
 
 async def send_email(to: str, subject: str, body_html: str) -> bool:
     """Send an email via SMTP. Returns True on success."""
@@ -20,42 +78,34 @@ async def send_email(to: str, subject: str, body_html: str) -> bool:
     message["Subject"] = subject
     message.set_content(body_html, subtype="html")
 
-    try:
-        await aiosmtplib.send(
-            message,
-            hostname=settings.SMTP_HOST,
-            port=settings.SMTP_PORT,
-            username=settings.SMTP_USERNAME or None,
-            password=settings.SMTP_PASSWORD or None,
-            start_tls=True,
-        )
+    async with _smtp_slots:
+        smtp = _idle_smtp.pop() if _idle_smtp else None
+        try:
+            if smtp is None or not smtp.is_connected:
+                smtp = await _connect_smtp()
+            try:
+                await smtp.send_message(message)
+            except aiosmtplib.SMTPServerDisconnected:
+                # The server dropped an idle connection; reconnect once
+                smtp = await _connect_smtp()
+                await smtp.send_message(message)
+        except Exception:
+            logger.exception("Failed to send email to %s", to)
+            # Don't reuse a connection left in an unknown state
+            if smtp is not None:
+                smtp.close()
+            return False
+        _idle_smtp.append(smtp)
         return True
-    except Exception:
-        logger.exception("Failed to send email to %s", to)
-        return False
 
 
 async def send_verification_email(to: str, token: str) -> bool:
     """Send email verification link."""
-    link = f"{settings.FRONTEND_URL}/verify-email?token={token}"
-    html = f"""
-    <h2>Welcome to Tether!</h2>
-    <p>Please verify your email address by clicking the link below:</p>
-    <p><a href="{link}">Verify Email</a></p>
-    <p>This link expires in 24 hours.</p>
-    <p>If you didn't create an account, you can ignore this email.</p>
-    """
-    return await send_email(to, "Verify your Tether email", html)
+    body = _render_link(VERIFY_HTML, "verify-email", token)
+    return await send_email(to, VERIFY_SUBJECT, body)
 
 
 async def send_password_reset_email(to: str, token: str) -> bool:
     """Send password reset link."""
-    link = f"{settings.FRONTEND_URL}/reset-password?token={token}"
-    html = f"""
-    <h2>Reset your Tether password</h2>
-    <p>Click the link below to reset your password:</p>
-    <p><a href="{link}">Reset Password</a></p>
-    <p>This link expires in 1 hour.</p>
-    <p>If you didn't request this, you can ignore this email.</p>
-    """
-    return await send_email(to, "Reset your Tether password", html)
+    body = _render_link(RESET_HTML, "reset-password", token)
+    return await send_email(to, RESET_SUBJECT, body)
@@ -1,12 +1,12 @@
 import uuid
-from collections import defaultdict
-from datetime import date, datetime, timedelta, timezone
+from datetime import date, datetime, time, timedelta, timezone
 
-from sqlalchemy import func, select
+from sqlalchemy import Integer, case, cast, func, literal_column, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.session import Session
 from app.models.session_event import SessionEvent
+from app.models.user_day_stats import UserDayStats
 from app.schemas.insights import (
     DistractionPattern,
     FocusTrend,
@@ -15,35 +15,51 @@ from app.schemas.insights import (
     SmartGoal,
 )
 
+# Streaks only look this far back, so the query touches a bounded slice of
+# the (user_id, start_time) index however long the user's history is.
+STREAK_MAX_DAYS = 400
+
 
 async def get_focus_heatmap(
     db: AsyncSession, user_id: uuid.UUID, days: int = 30
 ) -> list[HeatmapEntry]:
     """Aggregate focused time by hour-of-day and day-of-week from sessions.
 
-    Uses Python-side aggregation for cross-database compatibility
-    (SQLite strftime vs Postgres extract).
+    Grouping runs in SQL; the hour/weekday expressions differ between
+    SQLite (strftime) and Postgres (extract), both numbering Sunday as 0.
     """
     now = datetime.now(timezone.utc)
     start = now - timedelta(days=days)
 
+    if db.get_bind().dialect.name == "postgresql":
+        start_utc = func.timezone(literal_column("'UTC'"), Session.start_time)
+        hour_expr = func.extract("hour", start_utc)
+        dow_expr = func.extract("dow", start_utc)
+    else:
+        hour_expr = func.strftime("%H", Session.start_time)
+        dow_expr = func.strftime("%w", Session.start_time)
+
     result = await db.execute(
-        select(Session).where(
+        select(
+            hour_expr.label("hour"),
+            dow_expr.label("dow"),
+            func.coalesce(func.sum(Session.focused_seconds), 0).label(
+                "focused_seconds"
+            ),
+        )
+        .where(
             Session.user_id == user_id,
             Session.is_complete == True,  # noqa: E712
             Session.start_time >= start,
         )
+        .group_by(hour_expr, dow_expr)
     )
-    sessions = result.scalars().all()
 
-    # Aggregate by (hour, day_of_week)
-    grid: dict[tuple[int, int], float] = defaultdict(float)
-    for s in sessions:
-        st = s.start_time
-        # Python weekday(): Monday=0 .. Sunday=6
-        dow = st.weekday()
-        hour = st.hour
-        grid[(hour, dow)] += s.focused_seconds / 60.0
+    # Convert Sunday=0 numbering to Python weekday(): Monday=0 .. Sunday=6
+    grid = {
+        (int(row.hour), (int(row.dow) + 6) % 7): row.focused_seconds / 60.0
+        for row in result.all()
+    }
 
     return [
         HeatmapEntry(hour=hour, day_of_week=dow, focused_minutes=round(minutes, 1))
@@ -56,43 +72,35 @@ async def get_focus_trend(
 ) -> list[FocusTrend]:
     """Daily focus trend: focused_minutes, session_count, distraction_count per day.
 
-    Uses func.date() for cross-database date grouping (works on both
-    SQLite and Postgres).
+    Reads the per-day totals session_service maintains in user_day_stats,
+    so this is a range scan over at most `days` rows rather than a GROUP BY
+    over the sessions themselves.
     """
-    now = datetime.now(timezone.utc)
-    start = now - timedelta(days=days)
-
-    date_expr = func.date(Session.start_time)
+    start_day = (datetime.now(timezone.utc) - timedelta(days=days)).date()
 
     result = await db.execute(
         select(
-            date_expr.label("day"),
-            func.coalesce(func.sum(Session.focused_seconds), 0).label(
-                "focused_seconds"
-            ),
-            func.count(Session.id).label("session_count"),
-            func.coalesce(func.sum(Session.distraction_count), 0).label(
-                "distraction_count"
-            ),
+            UserDayStats.day,
+            UserDayStats.focused_seconds,
+            UserDayStats.session_count,
+            UserDayStats.distraction_count,
         )
         .where(
-            Session.user_id == user_id,
-            Session.is_complete == True,  # noqa: E712
-            Session.start_time >= start,
+            UserDayStats.user_id == user_id,
+            UserDayStats.day >= start_day,
+            UserDayStats.session_count > 0,
         )
-        .group_by(date_expr)
-        .order_by(date_expr)
+        .order_by(UserDayStats.day)
     )
 
-    rows = result.all()
     return [
         FocusTrend(
-            date=str(row.day),
-            focused_minutes=round((row.focused_seconds or 0) / 60.0, 1),
+            date=row.day.isoformat(),
+            focused_minutes=round(row.focused_seconds / 60.0, 1),
             session_count=row.session_count,
             distraction_count=row.distraction_count,
         )
-        for row in rows
+        for row in result.all()
     ]
 
 
@@ -107,10 +115,11 @@ async def get_distraction_patterns(
     now = datetime.now(timezone.utc)
     start = now - timedelta(days=days)
 
+    event_count = func.count().label("count")
     result = await db.execute(
         select(
             SessionEvent.app_name,
-            func.count(SessionEvent.id).label("count"),
+            event_count,
             func.coalesce(func.sum(SessionEvent.duration_seconds), 0).label(
                 "total_duration"
             ),
@@ -123,7 +132,7 @@ async def get_distraction_patterns(
             SessionEvent.app_name.isnot(None),
         )
         .group_by(SessionEvent.app_name)
-        .order_by(func.count(SessionEvent.id).desc())
+        .order_by(event_count.desc())
         .limit(10)
     )
 
@@ -146,55 +155,54 @@ async def get_optimal_session_length(
     computes average focus_ratio per bucket, and returns the bucket with the
     highest ratio. Minimum 3 sessions per bucket to be considered.
     """
+    # Duration bucket upper bounds in seconds, labelled by minutes
+    bucket_expr = case(
+        (Session.duration_seconds < 20 * 60, 15),
+        (Session.duration_seconds < 35 * 60, 25),
+        (Session.duration_seconds < 52 * 60, 45),
+        (Session.duration_seconds < 75 * 60, 60),
+        else_=90,
+    )
+
     result = await db.execute(
-        select(Session).where(
+        select(
+            bucket_expr.label("bucket"),
+            func.avg(Session.focused_seconds * 1.0 / Session.duration_seconds).label(
+                "avg_ratio"
+            ),
+            func.count().label("sample_size"),
+        )
+        .where(
             Session.user_id == user_id,
             Session.is_complete == True,  # noqa: E712
             Session.duration_seconds > 0,
         )
+        .group_by(bucket_expr)
     )
-    sessions = result.scalars().all()
-
-    # Duration bucket boundaries in seconds: (label_minutes, min_seconds, max_seconds)
-    buckets = [
-        (15, 0, 20 * 60),
-        (25, 20 * 60, 35 * 60),
-        (45, 35 * 60, 52 * 60),
-        (60, 52 * 60, 75 * 60),
-        (90, 75 * 60, float("inf")),
-    ]
-
-    bucket_data: dict[int, list[float]] = {label: [] for label, _, _ in buckets}
 
-    for s in sessions:
-        ratio = s.focused_seconds / s.duration_seconds if s.duration_seconds > 0 else 0
-        for label, lo, hi in buckets:
-            if lo <= s.duration_seconds < hi:
-                bucket_data[label].append(ratio)
-                break
+    bucket_data: dict[int, tuple[float, int]] = {
+        row.bucket: (float(row.avg_ratio or 0.0), row.sample_size)
+        for row in result.all()
+    }
 
     # Find the bucket with the highest average focus ratio (min 3 samples)
     best_label = 25  # sensible default
     best_ratio = 0.0
     best_count = 0
 
-    for label, ratios in bucket_data.items():
-        if len(ratios) >= 3:
-            avg = sum(ratios) / len(ratios)
-            if avg > best_ratio:
-                best_ratio = avg
-                best_label = label
-                best_count = len(ratios)
+    for label, (avg, count) in sorted(bucket_data.items()):
+        if count >= 3 and avg > best_ratio:
+            best_ratio = avg
+            best_label = label
+            best_count = count
 
     # If no bucket has enough samples, use the bucket with the most sessions
     if best_count == 0:
-        for label, ratios in bucket_data.items():
-            if len(ratios) > best_count:
-                best_count = len(ratios)
+        for label, (avg, count) in sorted(bucket_data.items()):
+            if count > best_count:
+                best_count = count
                 best_label = label
-                best_ratio = (
-                    sum(ratios) / len(ratios) if ratios else 0.0
-                )
+                best_ratio = avg
 
     return OptimalSessionLength(
         recommended_minutes=best_label,
@@ -215,46 +223,43 @@ async def get_smart_goals(
     current_week_start = now - timedelta(days=7)
     previous_week_start = now - timedelta(days=14)
 
-    async def _week_stats(start: datetime, end: datetime) -> dict:
-        result = await db.execute(
-            select(
-                func.coalesce(func.sum(Session.focused_seconds), 0).label(
-                    "focused_seconds"
-                ),
-                func.count(Session.id).label("session_count"),
-                func.coalesce(func.sum(Session.distraction_count), 0).label(
-                    "distraction_count"
-                ),
-            ).where(
-                Session.user_id == user_id,
-                Session.is_complete == True,  # noqa: E712
-                Session.start_time >= start,
-                Session.start_time < end,
-            )
+    # Both weeks in one pass, split by which week the session started in
+    week_expr = case(
+        (Session.start_time >= current_week_start, "current"), else_="previous"
+    )
+    result = await db.execute(
+        select(
+            week_expr.label("week"),
+            func.coalesce(func.sum(Session.focused_seconds), 0).label(
+                "focused_seconds"
+            ),
+            func.count(Session.id).label("session_count"),
+            func.coalesce(func.sum(Session.distraction_count), 0).label(
+                "distraction_count"
+            ),
         )
-        row = result.one()
-        return {
-            "focused_seconds": row.focused_seconds,
-            "session_count": row.session_count,
-            "distraction_count": row.distraction_count,
-        }
-
-    current = await _week_stats(current_week_start, now)
-    previous = await _week_stats(previous_week_start, current_week_start)
-
-    # Calculate streak
-    date_expr = func.date(Session.start_time)
-    streak_result = await db.execute(
-        select(date_expr.label("session_date"))
         .where(
             Session.user_id == user_id,
             Session.is_complete == True,  # noqa: E712
+            Session.start_time >= previous_week_start,
+            Session.start_time < now,
         )
-        .group_by(date_expr)
-        .order_by(date_expr.desc())
+        .group_by(week_expr)
     )
-    raw_dates = [row.session_date for row in streak_result.all()]
-    streak = _calculate_streak(raw_dates)
+    week_stats = {
+        "current": {"focused_seconds": 0, "session_count": 0, "distraction_count": 0},
+        "previous": {"focused_seconds": 0, "session_count": 0, "distraction_count": 0},
+    }
+    for row in result.all():
+        week_stats[row.week] = {
+            "focused_seconds": row.focused_seconds,
+            "session_count": row.session_count,
+            "distraction_count": row.distraction_count,
+        }
+    current = week_stats["current"]
+    previous = week_stats["previous"]
+
+    streak = await get_current_streak(db, user_id)
 
     goals: list[SmartGoal] = []
 
@@ -324,6 +329,46 @@ async def get_smart_goals(
     return goals
 
 
+async def get_current_streak(db: AsyncSession, user_id: uuid.UUID) -> int:
+    """Count consecutive days with completed sessions ending at today.
+
+    On Postgres this is a gaps-and-islands query returning a single count:
+    for dates in descending order, date + row_number() is constant within a
+    run of consecutive days, and the current streak is the run containing
+    today (today + 1). Elsewhere the most recent dates are walked in Python.
+    """
+    today = date.today()
+    window_start = datetime.combine(
+        today - timedelta(days=STREAK_MAX_DAYS), time.min, tzinfo=timezone.utc
+    )
+    date_expr = func.date(Session.start_time)
+    dates_query = (
+        select(date_expr.label("session_date"))
+        .where(
+            Session.user_id == user_id,
+            Session.is_complete == True,  # noqa: E712
+            Session.start_time >= window_start,
+        )
+        .group_by(date_expr)
+    )
+
+    if db.get_bind().dialect.name == "postgresql":
+        dates = dates_query.where(date_expr <= today).subquery()
+        row_number = func.row_number().over(order_by=dates.c.session_date.desc())
+        islands = select(
+            (dates.c.session_date + cast(row_number, Integer)).label("island")
+        ).subquery()
+        result = await db.execute(
+            select(func.count())
+            .select_from(islands)
+            .where(islands.c.island == today + timedelta(days=1))
+        )
+        return result.scalar_one()
+
+    result = await db.execute(dates_query.order_by(date_expr.desc()))
+    return _calculate_streak([row.session_date for row in result.all()])
+
+
 def _calculate_streak(raw_dates: list) -> int:
     """Calculate consecutive days with sessions ending at today."""
     if not raw_dates:
@@ -1,11 +1,27 @@
+import asyncio
 import uuid
 
+import orjson
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.device import Device
 from app.models.user import User
 
+try:
+    from aioapns import NotificationRequest
+except ImportError:  # aioapns not installed — push is skipped in dev
+    NotificationRequest = None
+
+# iOS push tokens per user, cached briefly in Redis so bursts of
+# notifications to the same user don't repeat the device lookup. Device
+# register/unregister drops the affected users' keys on every worker.
+PUSH_TOKEN_CACHE_TTL_SECONDS = 60
+
+
+def _push_tokens_key(user_id: uuid.UUID) -> str:
+    return f"push_tokens:{user_id}"
+
 
 async def get_user_devices(db: AsyncSession, user_id: uuid.UUID) -> list[Device]:
     """Get all registered devices for a user."""
@@ -15,47 +31,80 @@ async def get_user_devices(db: AsyncSession, user_id: uuid.UUID) -> list[Device]
     return list(result.scalars().all())
 
 
+async def _get_push_tokens(
+    db: AsyncSession, user_id: uuid.UUID, redis_client=None
+) -> list[str]:
+    """iOS device tokens for a user, served from the short-lived cache."""
+    if redis_client is not None:
+        cached = await redis_client.get(_push_tokens_key(user_id))
+        if cached is not None:
+            return orjson.loads(cached)
+
+    result = await db.execute(
+        select(Device.token).where(Device.user_id == user_id, Device.platform == "ios")
+    )
+    tokens = list(result.scalars().all())
+
+    if redis_client is not None:
+        await redis_client.set(
+            _push_tokens_key(user_id), orjson.dumps(tokens), ex=PUSH_TOKEN_CACHE_TTL_SECONDS
+        )
+    return tokens
+
+
+async def invalidate_user_devices(redis_client, *user_ids: uuid.UUID) -> None:
+    """Drop cached push tokens; call once the device change is committed."""
+    if redis_client is not None and user_ids:
+        await redis_client.delete(*(_push_tokens_key(user_id) for user_id in user_ids))
+
+
+async def _display_name(db: AsyncSession, user_id: uuid.UUID, default: str) -> str:
+    """Fetch just a user's display name, falling back to default."""
+    result = await db.execute(select(User.display_name).where(User.id == user_id))
+    return result.scalar_one_or_none() or default
+
+
 async def send_push_notification(
     db: AsyncSession,
     to_user_id: uuid.UUID,
     title: str,
     body: str,
     apns_client=None,
+    redis_client=None,
 ) -> int:
     """Send push notification to all devices of a user.
 
     Returns the number of notifications sent.
     Uses aioapns client if provided, otherwise logs intent for testing.
     """
-    devices = await get_user_devices(db, to_user_id)
-    sent = 0
-
-    for device in devices:
-        if device.platform == "ios" and apns_client is not None:
-            try:
-                from aioapns import NotificationRequest
-
-                notification = NotificationRequest(
-                    device_token=device.token,
-                    message={
-                        "aps": {
-                            "alert": {"title": title, "body": body},
-                            "sound": "default",
-                            "badge": 1,
-                        }
-                    },
-                )
-                response = await apns_client.send_notification(notification)
-                if response.is_successful:
-                    sent += 1
-            except ImportError:
-                # aioapns not installed — skip silently in dev
-                pass
-            except Exception:
-                # Individual send failures shouldn't break the loop
-                pass
-
-    return sent
+    if apns_client is None or NotificationRequest is None:
+        return 0
+
+    tokens = await _get_push_tokens(db, to_user_id, redis_client)
+    message = {
+        "aps": {
+            "alert": {"title": title, "body": body},
+            "sound": "default",
+            "badge": 1,
+        }
+    }
+
+    # APNs multiplexes requests over one HTTP/2 connection, so send to all
+    # devices at once; individual failures shouldn't affect the others.
+    responses = await asyncio.gather(
+        *(
+            apns_client.send_notification(
+                NotificationRequest(device_token=token, message=message)
+            )
+            for token in tokens
+        ),
+        return_exceptions=True,
+    )
+    return sum(
+        1
+        for response in responses
+        if not isinstance(response, BaseException) and response.is_successful
+    )
 
 
 async def notify_encourage(
@@ -64,16 +113,17 @@ async def notify_encourage(
     to_user_id: uuid.UUID,
     message: str,
     apns_client=None,
+    redis_client=None,
 ):
     """Send push notification for encouragement."""
-    from_user = await db.get(User, from_user_id)
-    name = from_user.display_name or "A friend" if from_user else "A friend"
+    name = await _display_name(db, from_user_id, "A friend")
     await send_push_notification(
         db,
         to_user_id,
         title=f"{name} sent you encouragement!",
         body=message[:100],
         apns_client=apns_client,
+        redis_client=redis_client,
     )
 
 
@@ -82,16 +132,17 @@ async def notify_ping(
     from_user_id: uuid.UUID,
     to_user_id: uuid.UUID,
     apns_client=None,
+    redis_client=None,
 ):
     """Send push notification for accountability ping."""
-    from_user = await db.get(User, from_user_id)
-    name = from_user.display_name or "A friend" if from_user else "A friend"
+    name = await _display_name(db, from_user_id, "A friend")
     await send_push_notification(
         db,
         to_user_id,
         title="Accountability Ping",
         body=f"{name} wants to know how you're doing!",
         apns_client=apns_client,
+        redis_client=redis_client,
     )
 
 
@@ -100,16 +151,17 @@ async def notify_friend_request(
     from_user_id: uuid.UUID,
     to_user_id: uuid.UUID,
     apns_client=None,
+    redis_client=None,
 ):
     """Send push notification for friend request."""
-    from_user = await db.get(User, from_user_id)
-    name = from_user.display_name or "Someone" if from_user else "Someone"
+    name = await _display_name(db, from_user_id, "Someone")
     await send_push_notification(
         db,
         to_user_id,
         title="Friend Request",
         body=f"{name} wants to be your accountability partner!",
         apns_client=apns_client,
+        redis_client=redis_client,
     )
 
 
@@ -118,6 +170,7 @@ async def notify_streak_milestone(
     user_id: uuid.UUID,
     streak_days: int,
     apns_client=None,
+    redis_client=None,
 ):
     """Send push notification for streak milestone."""
     await send_push_notification(
@@ -126,4 +179,5 @@ async def notify_streak_milestone(
         title="Streak Milestone!",
         body=f"You've maintained a {streak_days}-day focus streak! Keep it up!",
         apns_client=apns_client,
+        redis_client=redis_client,
     )
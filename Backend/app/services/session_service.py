@@ -1,11 +1,14 @@
 import uuid
-from datetime import datetime, timezone
+from datetime import date, datetime, timezone
 
-from sqlalchemy import select
+from sqlalchemy import select, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.session import Session
 from app.models.session_event import SessionEvent
+from app.models.user_day_stats import UserDayStats
 
 
 async def get_sessions(
@@ -30,30 +33,95 @@ async def create_session(db: AsyncSession, user_id: uuid.UUID, data: dict) -> Se
     session = Session(user_id=user_id, **data)
     db.add(session)
     await db.flush()
-    await db.refresh(session)
+    await _record_day_stats(db, user_id, None, _day_totals(session))
     return session
 
 
 async def update_session(
     db: AsyncSession, user_id: uuid.UUID, session_id: uuid.UUID, data: dict
 ) -> Session | None:
+    # Lock the row so concurrent updates of the same session compute their
+    # day-stat deltas one after another rather than from the same "before"
     result = await db.execute(
-        select(Session).where(Session.id == session_id, Session.user_id == user_id)
+        select(Session)
+        .where(Session.id == session_id, Session.user_id == user_id)
+        .with_for_update()
+        .execution_options(populate_existing=True)
     )
     session = result.scalar_one_or_none()
     if session is None:
         return None
 
+    before = _day_totals(session)
     for key, value in data.items():
         if value is not None:
             setattr(session, key, value)
     session.updated_at = datetime.now(timezone.utc)
 
     await db.flush()
-    await db.refresh(session)
+    await _record_day_stats(db, user_id, before, _day_totals(session))
     return session
 
 
+def _day_totals(session: Session) -> tuple[date, int, int, int] | None:
+    """A session's contribution to user_day_stats, or None if it isn't complete."""
+    if not session.is_complete:
+        return None
+    return (
+        _as_utc(session.start_time).date(),
+        session.focused_seconds or 0,
+        1,
+        session.distraction_count or 0,
+    )
+
+
+async def _record_day_stats(
+    db: AsyncSession,
+    user_id: uuid.UUID,
+    before: tuple[date, int, int, int] | None,
+    after: tuple[date, int, int, int] | None,
+) -> None:
+    """Apply the change in a session's contribution to its day's totals.
+
+    Each affected day gets one INSERT ... ON CONFLICT DO UPDATE adding the
+    difference, so the daily rows stay in step with edits to completed
+    sessions as well as with completion itself.
+    """
+    deltas: dict[date, list[int]] = {}
+    for totals, sign in ((before, -1), (after, 1)):
+        if totals is None:
+            continue
+        day, *values = totals
+        acc = deltas.setdefault(day, [0, 0, 0])
+        for i, value in enumerate(values):
+            acc[i] += sign * value
+
+    insert = pg_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+    for day, (focused, sessions, distractions) in deltas.items():
+        if not (focused or sessions or distractions):
+            continue
+        stmt = insert(UserDayStats).values(
+            user_id=user_id,
+            day=day,
+            focused_seconds=focused,
+            session_count=sessions,
+            distraction_count=distractions,
+        )
+        await db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=["user_id", "day"],
+                set_={
+                    "focused_seconds": UserDayStats.focused_seconds
+                    + stmt.excluded.focused_seconds,
+                    "session_count": UserDayStats.session_count
+                    + stmt.excluded.session_count,
+                    "distraction_count": UserDayStats.distraction_count
+                    + stmt.excluded.distraction_count,
+                },
+            )
+        )
+
+
 async def append_events_batch(
     db: AsyncSession,
     user_id: uuid.UUID,
@@ -68,31 +136,44 @@ async def append_events_batch(
     if session is None:
         return []
 
+    # Look up every (event_type, timestamp) pair in the batch at once
+    existing = await db.execute(
+        select(SessionEvent.event_type, SessionEvent.timestamp).where(
+            SessionEvent.session_id == session_id,
+            tuple_(SessionEvent.event_type, SessionEvent.timestamp).in_(
+                [(e["event_type"], e["timestamp"]) for e in events]
+            ),
+        )
+    )
+    seen = {(event_type, _as_utc(ts)) for event_type, ts in existing.all()}
+
+    # created_at is set here rather than by the server default so the new
+    # rows don't need a refresh round-trip after the flush.
+    now = datetime.now(timezone.utc)
     created = []
     for event_data in events:
-        # Check for duplicate (session_id + event_type + timestamp)
-        existing = await db.execute(
-            select(SessionEvent).where(
-                SessionEvent.session_id == session_id,
-                SessionEvent.event_type == event_data["event_type"],
-                SessionEvent.timestamp == event_data["timestamp"],
-            )
-        )
-        if existing.scalar_one_or_none() is not None:
+        key = (event_data["event_type"], _as_utc(event_data["timestamp"]))
+        if key in seen:
             continue  # Skip duplicate
+        seen.add(key)
 
-        event = SessionEvent(session_id=session_id, **event_data)
+        event = SessionEvent(session_id=session_id, created_at=now, **event_data)
         db.add(event)
         created.append(event)
 
     if created:
         await db.flush()
-        for event in created:
-            await db.refresh(event)
 
     return created
 
 
+def _as_utc(ts: datetime) -> datetime:
+    """Normalise a timestamp for comparison; SQLite returns naive UTC values."""
+    if ts.tzinfo is None:
+        return ts.replace(tzinfo=timezone.utc)
+    return ts.astimezone(timezone.utc)
+
+
 async def get_active_session(
     db: AsyncSession, user_id: uuid.UUID
 ) -> Session | None:
@@ -1,7 +1,10 @@
+import asyncio
 import logging
 
 import httpx
 
+from app.services._http import get_shared_client
+
 logger = logging.getLogger(__name__)
 
 SLACK_API_BASE = "https://slack.com/api"
@@ -24,78 +27,72 @@ async def set_focus_status(
 
     Returns True if all Slack API calls succeeded.
     """
-    should_close = False
     if http_client is None:
-        http_client = httpx.AsyncClient(timeout=10.0)
-        should_close = True
+        http_client = get_shared_client()
 
     headers = {
         "Authorization": f"Bearer {access_token}",
         "Content-Type": "application/json",
     }
 
+    if is_active:
+        # Set focus status and enable DND for 120 minutes
+        profile_json = {
+            "profile": {
+                "status_text": "Focusing in Tether",
+                "status_emoji": ":dart:",
+                "status_expiration": 0,
+            }
+        }
+        dnd_url = f"{SLACK_API_BASE}/dnd.setSnooze"
+        dnd_kwargs = {"json": {"num_minutes": 120}}
+    else:
+        # Clear status and end DND
+        profile_json = {
+            "profile": {
+                "status_text": "",
+                "status_emoji": "",
+                "status_expiration": 0,
+            }
+        }
+        dnd_url = f"{SLACK_API_BASE}/dnd.endSnooze"
+        dnd_kwargs = {}
+
+    profile_call = http_client.post(
+        f"{SLACK_API_BASE}/users.profile.set",
+        headers=headers,
+        json=profile_json,
+    )
+    dnd_call = http_client.post(dnd_url, headers=headers, **dnd_kwargs)
+
     try:
+        # The two calls are independent, so issue them concurrently
+        profile_resp, dnd_resp = await asyncio.gather(
+            profile_call, dnd_call, return_exceptions=True
+        )
+        for resp in (profile_resp, dnd_resp):
+            if isinstance(resp, BaseException):
+                raise resp
+
         success = True
+        action = "set" if is_active else "clear"
 
-        if is_active:
-            # Set focus status
-            profile_resp = await http_client.post(
-                f"{SLACK_API_BASE}/users.profile.set",
-                headers=headers,
-                json={
-                    "profile": {
-                        "status_text": "Focusing in Tether",
-                        "status_emoji": ":dart:",
-                        "status_expiration": 0,
-                    }
-                },
-            )
-            if not profile_resp.json().get("ok", False):
-                logger.warning("Slack profile set failed: %s", profile_resp.text)
-                success = False
+        if not profile_resp.json().get("ok", False):
+            logger.warning("Slack profile %s failed: %s", action, profile_resp.text)
+            success = False
 
-            # Enable DND for 120 minutes
-            dnd_resp = await http_client.post(
-                f"{SLACK_API_BASE}/dnd.setSnooze",
-                headers=headers,
-                json={"num_minutes": 120},
-            )
-            if not dnd_resp.json().get("ok", False):
-                logger.warning("Slack DND set failed: %s", dnd_resp.text)
-                success = False
-        else:
-            # Clear status
-            profile_resp = await http_client.post(
-                f"{SLACK_API_BASE}/users.profile.set",
-                headers=headers,
-                json={
-                    "profile": {
-                        "status_text": "",
-                        "status_emoji": "",
-                        "status_expiration": 0,
-                    }
-                },
-            )
-            if not profile_resp.json().get("ok", False):
-                logger.warning("Slack profile clear failed: %s", profile_resp.text)
+        if not dnd_resp.json().get("ok", False):
+            # dnd.endSnooze returns snooze_not_active if already off — treat as success
+            error = dnd_resp.json().get("error", "")
+            if is_active or error != "snooze_not_active":
+                logger.warning(
+                    "Slack DND %s failed: %s",
+                    "set" if is_active else "end",
+                    dnd_resp.text,
+                )
                 success = False
 
-            # End DND
-            dnd_resp = await http_client.post(
-                f"{SLACK_API_BASE}/dnd.endSnooze",
-                headers=headers,
-            )
-            if not dnd_resp.json().get("ok", False):
-                # dnd.endSnooze returns not_snoozing if already off — treat as success
-                error = dnd_resp.json().get("error", "")
-                if error != "snooze_not_active":
-                    logger.warning("Slack DND end failed: %s", dnd_resp.text)
-                    success = False
-
         return success
     except httpx.HTTPError as exc:
         logger.error("Slack API request failed: %s", exc)
         return False
-    finally:
-        if should_close:
-            await http_client.aclose()
@@ -1,10 +1,15 @@
-import json
 import secrets
 import uuid
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 from datetime import datetime, timedelta, timezone
 
-from sqlalchemy import and_, func, or_, select
+import orjson
+from sqlalchemy import and_, case, exists, func, or_, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 
 from app.models.friendship import Friendship
 from app.models.group import Group
@@ -12,6 +17,8 @@ from app.models.group_member import GroupMember
 from app.models.session import Session
 from app.models.social_event import SocialEvent
 from app.models.user import User
+from app.models.user_day_stats import UserDayStats
+from app.services._redis import get_script
 from app.services.notification_service import (
     notify_encourage,
     notify_friend_request,
@@ -21,46 +28,49 @@ from app.services.notification_service import (
 
 async def get_friends(db: AsyncSession, user_id: uuid.UUID) -> list[dict]:
     """Get all friends (accepted) and pending invites for a user."""
+    # Join each friendship to the user on its other side in a single query
     result = await db.execute(
-        select(Friendship).where(
+        select(Friendship, User)
+        .join(User, User.id == _other_user_id(user_id))
+        .where(
             or_(
                 Friendship.user_id_1 == user_id,
                 Friendship.user_id_2 == user_id,
             )
         )
     )
-    friendships = result.scalars().all()
-
-    friends = []
-    for f in friendships:
-        friend_id = f.user_id_2 if f.user_id_1 == user_id else f.user_id_1
-        user_result = await db.execute(select(User).where(User.id == friend_id))
-        friend = user_result.scalar_one_or_none()
-        if friend:
-            friends.append({
-                "id": f.id,
-                "user_id": friend.id,
-                "display_name": friend.display_name,
-                "email": friend.email,
-                "status": f.status,
-                "since": f.created_at,
-            })
-    return friends
+
+    return [
+        {
+            "id": f.id,
+            "user_id": friend.id,
+            "display_name": friend.display_name,
+            "email": friend.email,
+            "status": f.status,
+            "since": f.created_at,
+        }
+        for f, friend in result.all()
+    ]
 
 
 async def send_invite(
     db: AsyncSession, user_id: uuid.UUID, email: str, redis_client, apns_client=None
 ) -> dict:
     """Send friend invite. Rate limited to 20/day."""
-    # Check rate limit
     today_key = f"invites:{user_id}:{datetime.now(timezone.utc).date()}"
-    count = await redis_client.get(today_key)
-    if count and int(count) >= 20:
-        raise ValueError("Daily invite limit reached (20/day)")
 
-    # Find target user
-    result = await db.execute(select(User).where(User.email == email))
-    target = result.scalar_one_or_none()
+    async with _daily_quota(
+        redis_client, today_key, 20, "Daily invite limit reached (20/day)"
+    ):
+        result = await db.execute(select(User).where(User.email == email))
+        target = result.scalar_one_or_none()
+        return await _create_invite(db, user_id, target, apns_client, redis_client)
+
+
+async def _create_invite(
+    db: AsyncSession, user_id: uuid.UUID, target: User | None, apns_client, redis_client
+) -> dict:
+    """Create the pending friendship for send_invite and notify the target."""
     if target is None:
         raise ValueError("User not found")
 
@@ -89,38 +99,79 @@ async def send_invite(
     db.add(friendship)
     await db.flush()
 
-    # Increment rate limit
-    await redis_client.incr(today_key)
-    await redis_client.expire(today_key, 86400)
-
     # Send push notification to invited user
-    await notify_friend_request(db, user_id, target.id, apns_client)
+    await notify_friend_request(db, user_id, target.id, apns_client, redis_client)
 
     return {"id": str(friendship.id), "status": "pending"}
 
 
+# Count one use of a daily counter atomically: INCR, set the TTL when the
+# key is created, and undo the increment if it went over the limit.
+# Returns the new count, or -1 when over the limit.
+DAILY_QUOTA_LUA = """
+local count = redis.call('INCR', KEYS[1])
+if count == 1 then
+    redis.call('EXPIRE', KEYS[1], ARGV[2])
+end
+if count > tonumber(ARGV[1]) then
+    redis.call('DECR', KEYS[1])
+    return -1
+end
+return count
+"""
+
+# Give back one use, but only while the counter still exists: DECR on an
+# expired key would recreate it at -1 with no TTL.
+DAILY_QUOTA_REFUND_LUA = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    return redis.call('DECR', KEYS[1])
+end
+return 0
+"""
+
+
+@asynccontextmanager
+async def _daily_quota(
+    redis_client, key: str, limit: int, message: str
+) -> AsyncIterator[None]:
+    """Reserve one use of a daily counter for the enclosed block.
+
+    The check and the increment are a single Lua script call (EVALSHA), so
+    they take one round-trip and concurrent requests can't both take the
+    last slot. The reservation is given back if the block raises, so only
+    successful actions count. Raises ValueError(message) over the limit.
+    """
+    script = get_script(redis_client, DAILY_QUOTA_LUA)
+    if await script(keys=[key], args=[limit, 86400]) < 0:
+        raise ValueError(message)
+
+    try:
+        yield
+    except BaseException:
+        await get_script(redis_client, DAILY_QUOTA_REFUND_LUA)(keys=[key])
+        raise
+
+
 async def accept_invite(
     db: AsyncSession, user_id: uuid.UUID, friendship_id: uuid.UUID
 ) -> bool:
-    """Accept a pending friend invite."""
+    """Accept a pending friend invite.
+
+    Only the non-initiating side of a pending friendship can accept; the
+    checks are part of the UPDATE so concurrent accepts can't both apply.
+    """
     result = await db.execute(
-        select(Friendship).where(Friendship.id == friendship_id)
+        update(Friendship)
+        .where(
+            Friendship.id == friendship_id,
+            Friendship.initiated_by != user_id,
+            or_(Friendship.user_id_1 == user_id, Friendship.user_id_2 == user_id),
+            Friendship.status == "pending",
+        )
+        .values(status="accepted")
+        .returning(Friendship.id)
     )
-    friendship = result.scalar_one_or_none()
-    if friendship is None:
-        return False
-
-    # Only the non-initiator can accept
-    if friendship.initiated_by == user_id:
-        return False
-
-    # Must be involved
-    if user_id not in (friendship.user_id_1, friendship.user_id_2):
-        return False
-
-    friendship.status = "accepted"
-    await db.flush()
-    return True
+    return result.scalar_one_or_none() is not None
 
 
 async def get_groups(db: AsyncSession, user_id: uuid.UUID) -> list[dict]:
@@ -178,63 +229,113 @@ async def create_group(db: AsyncSession, user_id: uuid.UUID, name: str) -> dict:
     }
 
 
+# Leaderboards are cached per group for this long. Entries for every
+# member are stored with a private flag so each viewer is filtered from the
+# same cached copy.
+LEADERBOARD_CACHE_TTL_SECONDS = 90
+
+
 async def get_leaderboard(
-    db: AsyncSession, group_id: uuid.UUID, user_id: uuid.UUID
+    db: AsyncSession, group_id: uuid.UUID, user_id: uuid.UUID, redis_client=None
 ) -> list[dict]:
     """Get weekly leaderboard for a group, respecting privacy settings."""
-    week_ago = datetime.now(timezone.utc) - timedelta(days=7)
-
-    # Get group members
-    members_result = await db.execute(
-        select(GroupMember.user_id).where(GroupMember.group_id == group_id)
-    )
-    member_ids = [row[0] for row in members_result.all()]
+    cache_key = f"leaderboard:{group_id}"
+    cached = await redis_client.get(cache_key) if redis_client is not None else None
+    if cached is not None:
+        members = orjson.loads(cached)
+    else:
+        members = await _leaderboard_members(db, group_id)
+        if redis_client is not None:
+            await redis_client.set(
+                cache_key, orjson.dumps(members), ex=LEADERBOARD_CACHE_TTL_SECONDS
+            )
 
-    if user_id not in member_ids:
+    viewer = str(user_id)
+    if not any(m["user_id"] == viewer for m in members):
         raise ValueError("Not a member of this group")
 
-    # Get stats per member, respecting visibility
-    entries = []
-    for mid in member_ids:
-        user_result = await db.execute(select(User).where(User.id == mid))
-        member = user_result.scalar_one_or_none()
-        if not member:
-            continue
-
-        # Respect privacy
-        visibility = (member.settings_json or {}).get("visibility", "private")
-        if visibility == "private" and mid != user_id:
-            continue
-
-        stats_result = await db.execute(
-            select(
-                func.coalesce(func.sum(Session.focused_seconds), 0),
-                func.count(Session.id),
-            ).where(
-                Session.user_id == mid,
-                Session.is_complete == True,  # noqa: E712
-                Session.start_time >= week_ago,
-            )
-        )
-        row = stats_result.one()
-        entries.append({
-            "user_id": mid,
-            "display_name": member.display_name,
-            "focused_seconds": row[0],
-            "session_count": row[1],
-        })
+    # Members come back from the database already ordered by focused time, so
+    # ranks follow from position once the viewer's privacy filter is applied
+    visible = (m for m in members if not m["private"] or m["user_id"] == viewer)
+    return [
+        {
+            "user_id": uuid.UUID(m["user_id"]),
+            "display_name": m["display_name"],
+            "focused_seconds": m["focused_seconds"],
+            "session_count": m["session_count"],
+            "rank": rank,
+        }
+        for rank, m in enumerate(visible, start=1)
+    ]
+
+
+async def invalidate_leaderboards(
+    db: AsyncSession, user_id: uuid.UUID, redis_client
+) -> None:
+    """Drop cached leaderboards for every group the user belongs to."""
+    result = await db.execute(
+        select(GroupMember.group_id).where(GroupMember.user_id == user_id)
+    )
+    keys = [f"leaderboard:{group_id}" for group_id in result.scalars().all()]
+    if keys:
+        await redis_client.delete(*keys)
+
+
+async def _leaderboard_members(db: AsyncSession, group_id: uuid.UUID) -> list[dict]:
+    """Weekly totals for every member of a group, JSON-ready for caching.
+
+    One query: members are outer-joined to their precomputed daily totals
+    for the last 7 calendar days in UTC, today included (user_day_stats,
+    kept current as sessions complete) and
+    grouped per user, so the cost doesn't grow with how many sessions they
+    logged. The privacy flag is read from settings_json in SQL rather than
+    by loading whole User rows. Rows are ordered by focused time, highest
+    first.
+    """
+    start_day = (datetime.now(timezone.utc) - timedelta(days=6)).date()
+    is_private = (
+        func.coalesce(User.settings_json["visibility"].as_string(), "private")
+        == "private"
+    )
+    focused_seconds = func.coalesce(func.sum(UserDayStats.focused_seconds), 0).label(
+        "focused_seconds"
+    )
 
-    # Sort by focused_seconds descending and assign ranks
-    entries.sort(key=lambda e: e["focused_seconds"], reverse=True)
-    for i, entry in enumerate(entries):
-        entry["rank"] = i + 1
+    result = await db.execute(
+        select(
+            User.id,
+            User.display_name,
+            is_private.label("private"),
+            focused_seconds,
+            func.coalesce(func.sum(UserDayStats.session_count), 0).label(
+                "session_count"
+            ),
+        )
+        .join(GroupMember, GroupMember.user_id == User.id)
+        .outerjoin(
+            UserDayStats,
+            and_(UserDayStats.user_id == User.id, UserDayStats.day >= start_day),
+        )
+        .where(GroupMember.group_id == group_id)
+        .group_by(User.id)
+        .order_by(focused_seconds.desc(), User.id)
+    )
 
-    return entries
+    return [
+        {
+            "user_id": str(row.id),
+            "display_name": row.display_name,
+            "focused_seconds": row.focused_seconds,
+            "session_count": row.session_count,
+            "private": bool(row.private),
+        }
+        for row in result.all()
+    ]
 
 
 async def send_encourage(
     db: AsyncSession, from_user_id: uuid.UUID, to_user_id: uuid.UUID, message: str,
-    apns_client=None,
+    apns_client=None, redis_client=None,
 ) -> None:
     """Send encouragement to a friend."""
     # Verify friendship
@@ -250,7 +351,7 @@ async def send_encourage(
     db.add(event)
     await db.flush()
 
-    await notify_encourage(db, from_user_id, to_user_id, message, apns_client)
+    await notify_encourage(db, from_user_id, to_user_id, message, apns_client, redis_client)
 
 
 async def send_ping(
@@ -262,57 +363,50 @@ async def send_ping(
         raise ValueError("Can only ping friends")
 
     today_key = f"pings:{from_user_id}:{to_user_id}:{datetime.now(timezone.utc).date()}"
-    count = await redis_client.get(today_key)
-    if count and int(count) >= 5:
-        raise ValueError("Daily ping limit reached (5/friend/day)")
-
-    event = SocialEvent(
-        from_user_id=from_user_id,
-        to_user_id=to_user_id,
-        event_type="ping",
-    )
-    db.add(event)
-    await db.flush()
-
-    await redis_client.incr(today_key)
-    await redis_client.expire(today_key, 86400)
+    async with _daily_quota(
+        redis_client, today_key, 5, "Daily ping limit reached (5/friend/day)"
+    ):
+        event = SocialEvent(
+            from_user_id=from_user_id,
+            to_user_id=to_user_id,
+            event_type="ping",
+        )
+        db.add(event)
+        await db.flush()
 
-    await notify_ping(db, from_user_id, to_user_id, apns_client)
+        await notify_ping(db, from_user_id, to_user_id, apns_client, redis_client)
 
 
 async def are_friends(db: AsyncSession, user_a: uuid.UUID, user_b: uuid.UUID) -> bool:
     """Check if two users are accepted friends."""
     uid1, uid2 = (min(user_a, user_b), max(user_a, user_b))
     result = await db.execute(
-        select(Friendship).where(
-            Friendship.user_id_1 == uid1,
-            Friendship.user_id_2 == uid2,
-            Friendship.status == "accepted",
+        select(
+            exists().where(
+                Friendship.user_id_1 == uid1,
+                Friendship.user_id_2 == uid2,
+                Friendship.status == "accepted",
+            )
         )
     )
-    return result.scalar_one_or_none() is not None
+    return result.scalar_one()
 
 
 async def generate_invite_link(
     db: AsyncSession, user_id: uuid.UUID, redis_client
 ) -> dict:
     """Generate a shareable invite link. Rate limited to 20/day (shared with email invites)."""
-    # Check rate limit (shares counter with email invites)
+    # Rate limit (shares counter with email invites)
     today_key = f"invites:{user_id}:{datetime.now(timezone.utc).date()}"
-    count = await redis_client.get(today_key)
-    if count and int(count) >= 20:
-        raise ValueError("Daily invite limit reached (20/day)")
-
-    # Generate unique 8-char alphanumeric code
-    code = secrets.token_urlsafe(6)[:8]
+    async with _daily_quota(
+        redis_client, today_key, 20, "Daily invite limit reached (20/day)"
+    ):
+        # Generate unique 8-char alphanumeric code
+        code = secrets.token_urlsafe(6)[:8]
 
-    # Store in Redis with 7-day TTL
-    redis_key = f"invite_link:{code}"
-    await redis_client.set(redis_key, str(user_id), ex=604800)
-
-    # Increment shared rate limit counter
-    await redis_client.incr(today_key)
-    await redis_client.expire(today_key, 86400)
+        # Store in Redis with 7-day TTL
+        redis_key = f"invite_link:{code}"
+        await redis_client.set(redis_key, str(user_id), ex=604800)
 
     invite_url = f"https://tether.app/invite/{code}"
     return {"invite_code": code, "invite_url": invite_url}
@@ -385,33 +479,32 @@ async def react_to_session(
     if not await are_friends(db, user_id, session.user_id):
         raise ValueError("Can only react to friends' sessions")
 
-    # Prevent duplicate reactions (same user + session + type)
-    metadata_like = f'"session_id": "{session_id}"'
-    existing_result = await db.execute(
-        select(SocialEvent).where(
-            SocialEvent.from_user_id == user_id,
-            SocialEvent.to_user_id == session.user_id,
-            SocialEvent.event_type == "reaction",
-            SocialEvent.message.contains(str(session_id)),
-            SocialEvent.message.contains(reaction_type),
-        )
-    )
-    if existing_result.scalar_one_or_none() is not None:
-        raise ValueError("Already reacted with this type")
-
-    # Create social event for the reaction
-    message_json = json.dumps({
+    # Create social event for the reaction; the partial unique index turns a
+    # duplicate (same user + session + type) into a no-op insert
+    message_json = orjson.dumps({
         "session_id": str(session_id),
         "reaction_type": reaction_type,
-    })
-    event = SocialEvent(
-        from_user_id=user_id,
-        to_user_id=session.user_id,
-        event_type="reaction",
-        message=message_json,
+    }).decode()
+    insert = pg_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+    result = await db.execute(
+        insert(SocialEvent)
+        .values(
+            from_user_id=user_id,
+            to_user_id=session.user_id,
+            event_type="reaction",
+            message=message_json,
+            session_id=session_id,
+            reaction_type=reaction_type,
+        )
+        .on_conflict_do_nothing(
+            index_elements=["from_user_id", "session_id", "reaction_type"],
+            index_where=SocialEvent.event_type == "reaction",
+        )
+        .returning(SocialEvent.id, SocialEvent.timestamp)
     )
-    db.add(event)
-    await db.flush()
+    event = result.one_or_none()
+    if event is None:
+        raise ValueError("Already reacted with this type")
 
     # Get reactor display name
     reactor = await db.get(User, user_id)
@@ -430,45 +523,37 @@ async def get_session_reactions(
     session_id: uuid.UUID,
 ) -> list[dict]:
     """Get all reactions for a session."""
-    # Verify the session exists
-    result = await db.execute(select(Session).where(Session.id == session_id))
-    session = result.scalar_one_or_none()
-    if session is None:
+    # Verify the session exists; only its owner is needed
+    result = await db.execute(select(Session.user_id).where(Session.id == session_id))
+    owner_id = result.scalar_one_or_none()
+    if owner_id is None:
         raise ValueError("Session not found")
 
     # Verify the user is the session owner or a friend
-    if session.user_id != user_id:
-        if not await are_friends(db, user_id, session.user_id):
+    if owner_id != user_id:
+        if not await are_friends(db, user_id, owner_id):
             raise ValueError("Not authorized to view reactions")
 
-    # Get all reaction events for this session
+    # Get all reaction events for this session with the reactors' names
     result = await db.execute(
-        select(SocialEvent).where(
+        select(SocialEvent, User.display_name)
+        .outerjoin(User, User.id == SocialEvent.from_user_id)
+        .where(
+            SocialEvent.session_id == session_id,
             SocialEvent.event_type == "reaction",
-            SocialEvent.message.contains(str(session_id)),
         )
     )
-    events = result.scalars().all()
-
-    reactions = []
-    for event in events:
-        try:
-            meta = json.loads(event.message)
-        except (json.JSONDecodeError, TypeError):
-            continue
-        # Verify this reaction is actually for the requested session
-        if meta.get("session_id") != str(session_id):
-            continue
-        reactor = await db.get(User, event.from_user_id)
-        reactions.append({
+
+    return [
+        {
             "id": event.id,
             "user_id": event.from_user_id,
-            "display_name": reactor.display_name if reactor else None,
-            "reaction_type": meta.get("reaction_type", ""),
+            "display_name": display_name,
+            "reaction_type": event.reaction_type or "",
             "created_at": event.timestamp,
-        })
-
-    return reactions
+        }
+        for event, display_name in result.all()
+    ]
 
 
 async def get_friend_activity(
@@ -483,9 +568,11 @@ async def get_friend_activity(
     if not friend_ids:
         return []
 
-    # Get completed sessions from friends in last 7 days
+    # Get completed sessions from friends in last 7 days, with their owners
+    # joined into the same query
     result = await db.execute(
         select(Session)
+        .options(joinedload(Session.user, innerjoin=True))
         .where(
             Session.user_id.in_(friend_ids),
             Session.is_complete == True,  # noqa: E712
@@ -494,60 +581,51 @@ async def get_friend_activity(
         .order_by(Session.start_time.desc())
         .limit(50)
     )
-    sessions = result.scalars().all()
-
-    activities = []
-    for sess in sessions:
-        # Get friend display name
-        friend = await db.get(User, sess.user_id)
-
-        # Check privacy: respect visibility settings
-        visibility = (friend.settings_json or {}).get("visibility", "private") if friend else "private"
-        if visibility == "private":
-            continue
-
-        # Get reactions for this session
-        reaction_result = await db.execute(
-            select(SocialEvent).where(
-                SocialEvent.event_type == "reaction",
-                SocialEvent.message.contains(str(sess.id)),
-            )
+    # Check privacy: respect visibility settings
+    sessions = [
+        sess
+        for sess in result.scalars().all()
+        if (sess.user.settings_json or {}).get("visibility", "private") != "private"
+    ]
+    if not sessions:
+        return []
+
+    # Reactions for all of these sessions, with reactor names, in one query
+    reaction_result = await db.execute(
+        select(SocialEvent, User.display_name)
+        .outerjoin(User, User.id == SocialEvent.from_user_id)
+        .where(
+            SocialEvent.session_id.in_([sess.id for sess in sessions]),
+            SocialEvent.event_type == "reaction",
         )
-        reaction_events = reaction_result.scalars().all()
-
-        reactions = []
-        for event in reaction_events:
-            try:
-                meta = json.loads(event.message)
-            except (json.JSONDecodeError, TypeError):
-                continue
-            if meta.get("session_id") != str(sess.id):
-                continue
-            reactor = await db.get(User, event.from_user_id)
-            reactions.append({
-                "id": event.id,
-                "user_id": event.from_user_id,
-                "display_name": reactor.display_name if reactor else None,
-                "reaction_type": meta.get("reaction_type", ""),
-            })
-
-        activities.append({
+    )
+    reactions_by_session: dict[uuid.UUID, list[dict]] = {}
+    for event, display_name in reaction_result.all():
+        reactions_by_session.setdefault(event.session_id, []).append({
+            "id": event.id,
+            "user_id": event.from_user_id,
+            "display_name": display_name,
+            "reaction_type": event.reaction_type or "",
+        })
+
+    return [
+        {
             "id": sess.id,
             "user_id": sess.user_id,
-            "display_name": friend.display_name if friend else None,
+            "display_name": sess.user.display_name,
             "start_time": sess.start_time,
             "duration_seconds": sess.duration_seconds,
             "focused_seconds": sess.focused_seconds,
-            "reactions": reactions,
-        })
-
-    return activities
+            "reactions": reactions_by_session.get(sess.id, []),
+        }
+        for sess in sessions
+    ]
 
 
 async def _get_friend_ids(db: AsyncSession, user_id: uuid.UUID) -> list[uuid.UUID]:
     """Get all accepted friend user IDs for a user."""
     result = await db.execute(
-        select(Friendship).where(
+        select(_other_user_id(user_id)).where(
             or_(
                 Friendship.user_id_1 == user_id,
                 Friendship.user_id_2 == user_id,
@@ -555,9 +633,12 @@ async def _get_friend_ids(db: AsyncSession, user_id: uuid.UUID) -> list[uuid.UUI
             Friendship.status == "accepted",
         )
     )
-    friendships = result.scalars().all()
-    friend_ids = []
-    for f in friendships:
-        friend_id = f.user_id_2 if f.user_id_1 == user_id else f.user_id_1
-        friend_ids.append(friend_id)
-    return friend_ids
+    return list(result.scalars().all())
+
+
+def _other_user_id(user_id: uuid.UUID):
+    """SQL expression for the friend's side of a canonically ordered Friendship."""
+    return case(
+        (Friendship.user_id_1 == user_id, Friendship.user_id_2),
+        else_=Friendship.user_id_1,
+    )
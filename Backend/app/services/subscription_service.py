@@ -1,7 +1,8 @@
 import uuid
 from datetime import datetime, timezone
 
-from sqlalchemy import select
+import orjson
+from sqlalchemy import bindparam, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.subscription import Subscription
@@ -10,16 +11,54 @@ from app.models.subscription import Subscription
 FREE_HISTORY_DAYS = 30
 FREE_MAX_FRIENDS = 3
 
+# Subscription state changes a few times a day at most, so pro-gated requests
+# read it from Redis. Verification drops the key; entries never outlive the
+# subscription's own expiry.
+SUBSCRIPTION_CACHE_TTL_SECONDS = 300
+_DATE_FIELDS = ("expiration_date", "trial_end_date")
 
-async def get_subscription_status(db: AsyncSession, user_id: uuid.UUID) -> dict:
+# Built once; the user is bound per execution
+_CURRENT_SUB_SELECT = (
+    select(Subscription)
+    .where(Subscription.user_id == bindparam("user_id"))
+    .where(Subscription.status.in_(["active", "trial"]))
+    .order_by(Subscription.created_at.desc())
+    .limit(1)
+)
+
+
+def _sub_cache_key(user_id: uuid.UUID) -> str:
+    return f"sub:{user_id}"
+
+
+async def get_subscription_status(
+    db: AsyncSession, user_id: uuid.UUID, redis_client=None
+) -> dict:
     """Get the current subscription status for a user."""
-    result = await db.execute(
-        select(Subscription)
-        .where(Subscription.user_id == user_id)
-        .where(Subscription.status.in_(["active", "trial"]))
-        .order_by(Subscription.created_at.desc())
-        .limit(1)
-    )
+    if redis_client is not None:
+        cached = await redis_client.get(_sub_cache_key(user_id))
+        if cached is not None:
+            status = orjson.loads(cached)
+            for field in _DATE_FIELDS:
+                if status[field] is not None:
+                    status[field] = datetime.fromisoformat(status[field])
+            return status
+
+    status = await _load_subscription_status(db, user_id)
+    if redis_client is not None:
+        ttl = SUBSCRIPTION_CACHE_TTL_SECONDS
+        if status["is_pro"]:
+            now = datetime.now(timezone.utc)
+            for field in _DATE_FIELDS:
+                if status[field] is not None:
+                    remaining = int((status[field] - now).total_seconds())
+                    ttl = max(1, min(ttl, remaining))
+        await redis_client.set(_sub_cache_key(user_id), orjson.dumps(status), ex=ttl)
+    return status
+
+
+async def _load_subscription_status(db: AsyncSession, user_id: uuid.UUID) -> dict:
+    result = await db.execute(_CURRENT_SUB_SELECT, {"user_id": user_id})
     sub = result.scalar_one_or_none()
 
     if sub is None:
@@ -38,8 +77,14 @@ async def get_subscription_status(db: AsyncSession, user_id: uuid.UUID) -> dict:
     trial_expired = sub.trial_end_date and sub.trial_end_date < now
 
     if is_expired or (is_trial and trial_expired):
-        sub.status = "expired"
-        await db.flush()
+        # Only active/trial rows are selected above, so this runs once per
+        # subscription; a targeted UPDATE avoids flushing the whole session
+        await db.execute(
+            update(Subscription)
+            .where(Subscription.id == sub.id, Subscription.status != "expired")
+            .values(status="expired")
+            .execution_options(synchronize_session=False)
+        )
         return {
             "is_pro": False,
             "product_id": sub.product_id,
@@ -96,7 +141,15 @@ async def verify_and_upsert_subscription(
     return sub
 
 
-async def is_user_pro(db: AsyncSession, user_id: uuid.UUID) -> bool:
+async def invalidate_subscription_status(redis_client, user_id: uuid.UUID) -> None:
+    """Drop a user's cached status; call once the change is committed."""
+    if redis_client is not None:
+        await redis_client.delete(_sub_cache_key(user_id))
+
+
+async def is_user_pro(
+    db: AsyncSession, user_id: uuid.UUID, redis_client=None
+) -> bool:
     """Quick check if user has active pro subscription."""
-    status = await get_subscription_status(db, user_id)
+    status = await get_subscription_status(db, user_id, redis_client)
     return status["is_pro"]
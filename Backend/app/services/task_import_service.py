@@ -2,8 +2,16 @@ import logging
 
 import httpx
 
+from app.services._http import get_shared_client
+
 logger = logging.getLogger(__name__)
 
+# Notion property names recognised for priority and due date. Due-date names
+# map to their precedence when a page has more than one of them.
+_PRIORITY_NAMES = frozenset({"Priority"})
+_DUE_NAMES = {"Due": 0, "Due Date": 1, "due": 2, "due_date": 3}
+_PRIORITY_MAP = {"low": 0, "medium": 1, "high": 2, "urgent": 3}
+
 
 class TodoistImporter:
     """Import tasks from Todoist REST API v2."""
@@ -26,10 +34,8 @@ class TodoistImporter:
         Returns:
             List of normalized task dicts with title, priority, due_date.
         """
-        should_close = False
         if http_client is None:
-            http_client = httpx.AsyncClient(timeout=15.0)
-            should_close = True
+            http_client = get_shared_client()
 
         headers = {"Authorization": f"Bearer {access_token}"}
         params = {}
@@ -41,6 +47,7 @@ class TodoistImporter:
                 f"{self.TODOIST_API_BASE}/tasks",
                 headers=headers,
                 params=params,
+                timeout=15.0,
             )
             if response.status_code >= 400:
                 logger.error("Todoist API returned %d", response.status_code)
@@ -51,9 +58,6 @@ class TodoistImporter:
         except httpx.HTTPError as exc:
             logger.error("Todoist API request failed: %s", exc)
             return []
-        finally:
-            if should_close:
-                await http_client.aclose()
 
     @staticmethod
     def _normalize_task(task: dict) -> dict:
@@ -80,6 +84,12 @@ class NotionImporter:
 
     NOTION_API_BASE = "https://api.notion.com/v1"
     NOTION_VERSION = "2022-06-28"
+    PAGE_SIZE = 100  # Notion's maximum
+    MAX_PAGES = 50
+
+    def __init__(self):
+        # Set by import_tasks when the database had more than MAX_PAGES pages
+        self.truncated = False
 
     async def import_tasks(
         self,
@@ -96,11 +106,11 @@ class NotionImporter:
 
         Returns:
             List of normalized task dicts with title, priority, due_date.
+            At most MAX_PAGES pages are read; truncated is set if rows remain.
         """
-        should_close = False
+        self.truncated = False
         if http_client is None:
-            http_client = httpx.AsyncClient(timeout=15.0)
-            should_close = True
+            http_client = get_shared_client()
 
         headers = {
             "Authorization": f"Bearer {access_token}",
@@ -108,60 +118,73 @@ class NotionImporter:
             "Content-Type": "application/json",
         }
 
+        # Notion returns at most PAGE_SIZE rows per query; each request needs
+        # the previous response's cursor, so pages are fetched in order
+        tasks = []
+        body: dict = {"page_size": self.PAGE_SIZE}
         try:
-            response = await http_client.post(
-                f"{self.NOTION_API_BASE}/databases/{database_id}/query",
-                headers=headers,
-                json={},
-            )
-            if response.status_code >= 400:
-                logger.error("Notion API returned %d", response.status_code)
-                return []
-            data = response.json()
-
-            results = data.get("results", [])
-            return [self._normalize_page(page) for page in results]
+            for _ in range(self.MAX_PAGES):
+                response = await http_client.post(
+                    f"{self.NOTION_API_BASE}/databases/{database_id}/query",
+                    headers=headers,
+                    json=body,
+                    timeout=15.0,
+                )
+                if response.status_code >= 400:
+                    logger.error("Notion API returned %d", response.status_code)
+                    return []
+                data = response.json()
+
+                tasks.extend(
+                    self._normalize_page(page) for page in data.get("results", [])
+                )
+                cursor = data.get("next_cursor")
+                if not data.get("has_more") or not cursor:
+                    break
+                body = {"page_size": self.PAGE_SIZE, "start_cursor": cursor}
+            else:
+                self.truncated = True
+                logger.warning(
+                    "Notion import of database %s stopped at %d pages (%d tasks)",
+                    database_id,
+                    self.MAX_PAGES,
+                    len(tasks),
+                )
+            return tasks
         except httpx.HTTPError as exc:
             logger.error("Notion API request failed: %s", exc)
             return []
-        finally:
-            if should_close:
-                await http_client.aclose()
 
     @staticmethod
     def _normalize_page(page: dict) -> dict:
         """Convert a Notion database page to normalized task format."""
         properties = page.get("properties", {})
 
-        # Extract title from the first title property
-        title = "Untitled"
-        for prop in properties.values():
-            if prop.get("type") == "title":
-                title_parts = prop.get("title", [])
-                if title_parts:
-                    title = "".join(
-                        part.get("plain_text", "") for part in title_parts
-                    )
-                break
-
-        # Extract priority (select property named "Priority")
+        # Classify properties in one pass: the first title property, a
+        # select named "Priority", and the highest-precedence due date
+        title = None
         priority = 1
-        priority_prop = properties.get("Priority", {})
-        if priority_prop.get("type") == "select" and priority_prop.get("select"):
-            priority_name = priority_prop["select"].get("name", "").lower()
-            priority_map = {"low": 0, "medium": 1, "high": 2, "urgent": 3}
-            priority = priority_map.get(priority_name, 1)
-
-        # Extract due date (date property named "Due" or "Due Date")
         due_date = None
-        for name in ("Due", "Due Date", "due", "due_date"):
-            date_prop = properties.get(name, {})
-            if date_prop.get("type") == "date" and date_prop.get("date"):
-                due_date = date_prop["date"].get("start")
-                break
+        due_rank = len(_DUE_NAMES)
+        for name, prop in properties.items():
+            prop_type = prop.get("type")
+            if prop_type == "title":
+                if title is None:
+                    title = "".join(
+                        part.get("plain_text", "") for part in prop.get("title", [])
+                    )
+            elif prop_type == "select":
+                if name in _PRIORITY_NAMES and prop.get("select"):
+                    priority_name = prop["select"].get("name", "").lower()
+                    priority = _PRIORITY_MAP.get(priority_name, 1)
+            elif prop_type == "date":
+                rank = _DUE_NAMES.get(name, due_rank)
+                if rank < due_rank and prop.get("date"):
+                    due_date = prop["date"].get("start")
+                    due_rank = rank
 
         return {
-            "title": title,
+            "title": title or "Untitled",
             "priority": priority,
             "due_date": due_date,
         }
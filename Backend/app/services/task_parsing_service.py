@@ -5,14 +5,33 @@ LLM provider abstraction from ai_coaching_service. Falls back gracefully
 when no provider is configured.
 """
 
-import json
 import logging
+from typing import Annotated, Literal
+
+import orjson
+from pydantic import BaseModel, Field, StringConstraints, TypeAdapter, ValidationError
 
 from app.config import settings
-from app.services.ai_coaching_service import create_provider
+from app.services.ai_coaching_service import bounded_generate, create_provider
 
 logger = logging.getLogger(__name__)
 
+VALID_PRIORITIES = frozenset({"urgent", "high", "medium", "low"})
+
+
+class _ParsedTask(BaseModel):
+    """A task exactly as the extraction prompt asks the model to return it."""
+
+    title: Annotated[str, StringConstraints(strip_whitespace=True, min_length=1)]
+    estimate_minutes: Annotated[int, Field(gt=0)] | None = None
+    priority: Literal["urgent", "high", "medium", "low"] = "medium"
+    project_name: str | None = None
+    due_date: str | None = None
+
+
+# Validator for well-formed responses, built once at import
+_TASK_LIST_ADAPTER = TypeAdapter(list[_ParsedTask])
+
 TASK_EXTRACTION_SYSTEM_PROMPT = """You are a task extraction engine. Given natural language input, extract individual tasks.
 
 Return a JSON array of objects with these fields:
@@ -45,7 +64,9 @@ async def parse_tasks_with_llm(text: str) -> dict:
         return {"tasks": [], "used_llm": False}
 
     try:
-        response = await provider.generate(TASK_EXTRACTION_SYSTEM_PROMPT, text)
+        response = await bounded_generate(
+            provider, TASK_EXTRACTION_SYSTEM_PROMPT, text
+        )
         tasks = _parse_tasks_json(response)
         return {"tasks": tasks, "used_llm": True}
     except Exception as e:
@@ -57,14 +78,22 @@ def _parse_tasks_json(raw: str) -> list[dict]:
     """Extract a JSON array of tasks from LLM response text."""
     stripped = raw.strip()
 
+    # Fast path: a bare array matching the prompt's schema decodes and
+    # validates in one pass. Anything else goes through the lenient
+    # extraction below, which normalizes or drops bad entries one by one.
+    try:
+        return [t.model_dump() for t in _TASK_LIST_ADAPTER.validate_json(stripped)]
+    except ValidationError:
+        pass
+
     # Try direct parse first
     try:
-        parsed = json.loads(stripped)
+        parsed = orjson.loads(stripped)
         if isinstance(parsed, list):
             return _validate_tasks(parsed)
         if isinstance(parsed, dict):
             return _validate_tasks([parsed])
-    except json.JSONDecodeError:
+    except orjson.JSONDecodeError:
         pass
 
     # Try extracting JSON array from surrounding text / markdown code blocks
@@ -72,10 +101,10 @@ def _parse_tasks_json(raw: str) -> list[dict]:
     end = stripped.rfind("]")
     if start != -1 and end != -1 and end > start:
         try:
-            parsed = json.loads(stripped[start : end + 1])
+            parsed = orjson.loads(stripped[start : end + 1])
             if isinstance(parsed, list):
                 return _validate_tasks(parsed)
-        except json.JSONDecodeError:
+        except orjson.JSONDecodeError:
             pass
 
     return []
@@ -84,7 +113,6 @@ def _parse_tasks_json(raw: str) -> list[dict]:
 def _validate_tasks(tasks: list) -> list[dict]:
     """Validate and normalize parsed task dicts."""
     validated = []
-    valid_priorities = {"urgent", "high", "medium", "low"}
 
     for t in tasks:
         if not isinstance(t, dict):
@@ -94,7 +122,7 @@ def _validate_tasks(tasks: list) -> list[dict]:
             continue
 
         priority = str(t.get("priority", "medium")).lower()
-        if priority not in valid_priorities:
+        if priority not in VALID_PRIORITIES:
             priority = "medium"
 
         estimate = t.get("estimate_minutes")
@@ -1,20 +1,32 @@
 import asyncio
-import hashlib
 import hmac
-import json
 import logging
+import random
 import uuid
 
 import httpx
-from sqlalchemy import select
+import orjson
+from sqlalchemy import cast, exists, func, select
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.webhook import Webhook
+from app.services._http import get_shared_client
 
 logger = logging.getLogger(__name__)
 
 VALID_EVENTS = {"session.start", "session.end", "task.complete"}
 
+# Upper bound on in-flight deliveries for a single fire_webhooks call
+MAX_CONCURRENT_DELIVERIES = 10
+
+# Retry backoff uses decorrelated jitter so endpoints failing together don't
+# retry in lockstep; the whole delivery, retries included, is time-boxed
+DELIVERY_ATTEMPTS = 3
+RETRY_BASE_DELAY_SECONDS = 1.0
+RETRY_MAX_DELAY_SECONDS = 8.0
+DELIVERY_TIMEOUT_SECONDS = 30.0
+
 
 async def deliver_webhook(
     webhook: Webhook,
@@ -25,16 +37,36 @@ async def deliver_webhook(
     """Deliver a webhook payload with HMAC-SHA256 signature.
 
     Signs the payload body with the webhook's secret key and POSTs
-    to the webhook URL. Retries up to 3 times with exponential backoff.
+    to the webhook URL. Retries up to 3 times with jittered exponential
+    backoff, giving up once DELIVERY_TIMEOUT_SECONDS have passed.
 
     Returns True if delivery succeeded, False otherwise.
     """
-    body = json.dumps(payload, default=str, sort_keys=True)
-    signature = hmac.new(
-        webhook.secret.encode("utf-8"),
-        body.encode("utf-8"),
-        hashlib.sha256,
-    ).hexdigest()
+    return await _deliver_body(
+        webhook.url, webhook.secret, event_type, _encode_payload(payload), http_client
+    )
+
+
+def _encode_payload(payload: dict) -> bytes:
+    """Serialize a payload as the signed request body (sorted keys)."""
+    return orjson.dumps(
+        payload,
+        default=str,
+        option=orjson.OPT_SORT_KEYS
+        | orjson.OPT_NON_STR_KEYS
+        | orjson.OPT_PASSTHROUGH_DATETIME,
+    )
+
+
+async def _deliver_body(
+    url: str,
+    secret: str,
+    event_type: str,
+    body: bytes,
+    http_client: httpx.AsyncClient | None = None,
+) -> bool:
+    """POST an already-encoded body; only the signature is per webhook."""
+    signature = hmac.digest(secret.encode("utf-8"), body, "sha256").hex()
 
     headers = {
         "Content-Type": "application/json",
@@ -42,41 +74,54 @@ async def deliver_webhook(
         "X-Tether-Signature": f"sha256={signature}",
     }
 
-    should_close = False
     if http_client is None:
-        http_client = httpx.AsyncClient(timeout=10.0)
-        should_close = True
+        http_client = get_shared_client()
 
-    delays = [1.0, 2.0, 4.0]
     try:
-        for attempt, delay in enumerate(delays):
-            try:
-                response = await http_client.post(
-                    webhook.url, content=body, headers=headers
-                )
-                if response.status_code < 400:
-                    return True
-                logger.warning(
-                    "Webhook delivery attempt %d to %s returned %d",
-                    attempt + 1,
-                    webhook.url,
-                    response.status_code,
-                )
-            except httpx.HTTPError as exc:
-                logger.warning(
-                    "Webhook delivery attempt %d to %s failed: %s",
-                    attempt + 1,
-                    webhook.url,
-                    exc,
-                )
-
-            if attempt < len(delays) - 1:
-                await asyncio.sleep(delay)
-
+        return await asyncio.wait_for(
+            _post_with_retries(url, body, headers, http_client),
+            timeout=DELIVERY_TIMEOUT_SECONDS,
+        )
+    except TimeoutError:
+        logger.warning(
+            "Webhook delivery to %s gave up after %.0fs",
+            url,
+            DELIVERY_TIMEOUT_SECONDS,
+        )
         return False
-    finally:
-        if should_close:
-            await http_client.aclose()
+
+
+async def _post_with_retries(
+    url: str, body: bytes, headers: dict, http_client: httpx.AsyncClient
+) -> bool:
+    delay = RETRY_BASE_DELAY_SECONDS
+    for attempt in range(DELIVERY_ATTEMPTS):
+        try:
+            response = await http_client.post(url, content=body, headers=headers)
+            if response.status_code < 400:
+                return True
+            logger.warning(
+                "Webhook delivery attempt %d to %s returned %d",
+                attempt + 1,
+                url,
+                response.status_code,
+            )
+        except httpx.HTTPError as exc:
+            logger.warning(
+                "Webhook delivery attempt %d to %s failed: %s",
+                attempt + 1,
+                url,
+                exc,
+            )
+
+        if attempt < DELIVERY_ATTEMPTS - 1:
+            delay = min(
+                RETRY_MAX_DELAY_SECONDS,
+                random.uniform(RETRY_BASE_DELAY_SECONDS, delay * 3),
+            )
+            await asyncio.sleep(delay)
+
+    return False
 
 
 async def fire_webhooks(
@@ -90,21 +135,40 @@ async def fire_webhooks(
 
     Returns the number of successfully delivered webhooks.
     """
+    # Only the delivery fields are loaded, and only for endpoints subscribed
+    # to this event
     result = await db.execute(
-        select(Webhook).where(
+        select(Webhook.url, Webhook.secret).where(
             Webhook.user_id == user_id,
             Webhook.is_active.is_(True),
+            _subscribes_to(db, event_type),
         )
     )
-    webhooks = list(result.scalars().all())
+    webhooks = result.all()
+
+    if http_client is None:
+        http_client = get_shared_client()
+
+    # Deliver to all endpoints at once over the shared pool; the semaphore
+    # keeps one user's fan-out from occupying the whole pool
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_DELIVERIES)
+
+    # Every endpoint receives the same bytes, so encode them once
+    body = _encode_payload(payload)
+
+    async def deliver(url: str, secret: str) -> bool:
+        async with semaphore:
+            return await _deliver_body(url, secret, event_type, body, http_client)
+
+    results = await asyncio.gather(
+        *(deliver(url, secret) for url, secret in webhooks)
+    )
+    return sum(results)
 
-    delivered = 0
-    for webhook in webhooks:
-        if event_type in webhook.events:
-            success = await deliver_webhook(
-                webhook, event_type, payload, http_client=http_client
-            )
-            if success:
-                delivered += 1
 
-    return delivered
+def _subscribes_to(db: AsyncSession, event_type: str):
+    """Condition matching webhooks whose events list includes event_type."""
+    if db.get_bind().dialect.name == "postgresql":
+        return cast(Webhook.events, JSONB).contains([event_type])
+    events = func.json_each(Webhook.events).table_valued("value")
+    return exists(select(events.c.value).where(events.c.value == event_type))
@@ -7,42 +7,207 @@ from httpx import ASGITransport, AsyncClient
 from sqlalchemy import StaticPool
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
+from app.config import settings
 from app.database import get_db
 from app.dependencies import get_current_user
 from app.main import app
 from app.models import Base
 from app.models.user import User
+from app.services.ai_coaching_service import AI_RATE_LIMIT_LUA, AI_RATE_REFUND_LUA
+from app.services.social_service import DAILY_QUOTA_LUA, DAILY_QUOTA_REFUND_LUA
 
 TEST_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
 
+# bcrypt's minimum cost; at the production cost every register, login and
+# password reset in the suite spends a few hundred ms hashing
+settings.BCRYPT_ROUNDS = 4
+
+
+class FakePipeline:
+    """Queues FakeRedis commands and runs them in order on execute()."""
+
+    def __init__(self, redis: "FakeRedis"):
+        self._redis = redis
+        self._calls: list = []
+
+    def __getattr__(self, name: str):
+        method = getattr(self._redis, name)
+
+        def queue(*args, **kwargs):
+            self._calls.append((method, args, kwargs))
+            return self
+
+        return queue
+
+    async def execute(self) -> list:
+        calls, self._calls = self._calls, []
+        return [await method(*args, **kwargs) for method, args, kwargs in calls]
+
+
+class FakeScript:
+    """Runs a registered Lua script through its Python equivalent."""
+
+    def __init__(self, redis: "FakeRedis", script: str):
+        self._redis = redis
+        self._run = FAKE_SCRIPTS[script]
+
+    async def __call__(self, keys=(), args=()):
+        return await self._run(self._redis, list(keys), list(args))
+
+
+async def _daily_quota_script(redis: "FakeRedis", keys: list, args: list) -> int:
+    count = await redis.incr(keys[0])
+    if count == 1:
+        await redis.expire(keys[0], int(args[1]))
+    if count > int(args[0]):
+        await redis.decr(keys[0])
+        return -1
+    return count
+
+
+async def _daily_quota_refund_script(redis: "FakeRedis", keys: list, args: list) -> int:
+    if not await redis.exists(keys[0]):
+        return 0
+    return await redis.decr(keys[0])
+
+
+async def _ai_rate_limit_script(redis: "FakeRedis", keys: list, args: list) -> int:
+    now, window, limit = (int(a) for a in args)
+    start = now - now % window
+    w, c, p = await redis.hmget(keys[0], "w", "c", "p")
+    w = int(w) if w is not None else start
+    c = int(c) if c is not None else 0
+    p = int(p) if p is not None else 0
+    if start > w:
+        p = c if start - w == window else 0
+        c = 0
+    c += 1
+    await redis.hset(keys[0], mapping={"w": start, "c": c, "p": p})
+    await redis.expire(keys[0], window * 2)
+    return int(p * (window - now % window) / window + c <= limit)
+
+
+async def _ai_rate_refund_script(redis: "FakeRedis", keys: list, args: list) -> int:
+    counted, window = (int(a) for a in args)
+    w = await redis.hget(keys[0], "w")
+    if w is None:
+        return 0
+    if int(w) == counted:
+        await redis.hincrby(keys[0], "c", -1)
+        return 1
+    if int(w) == counted + window:
+        await redis.hincrby(keys[0], "p", -1)
+        return 1
+    return 0
+
+
+FAKE_SCRIPTS = {
+    DAILY_QUOTA_LUA: _daily_quota_script,
+    DAILY_QUOTA_REFUND_LUA: _daily_quota_refund_script,
+    AI_RATE_LIMIT_LUA: _ai_rate_limit_script,
+    AI_RATE_REFUND_LUA: _ai_rate_refund_script,
+}
+
 
 class FakeRedis:
     """In-memory Redis mock for testing."""
 
+    __slots__ = ("_store", "_ttls", "_bits", "_hashes")
+
     def __init__(self):
         self._store: dict[str, str] = {}
         self._ttls: dict[str, int] = {}
+        self._bits: dict[str, set[int]] = {}
+        self._hashes: dict[str, dict[str, str]] = {}
+
+    def pipeline(self) -> FakePipeline:
+        return FakePipeline(self)
+
+    def register_script(self, script: str) -> FakeScript:
+        return FakeScript(self, script)
 
     async def get(self, key: str) -> str | None:
         return self._store.get(key)
 
-    async def set(self, key: str, value: str, ex: int | None = None) -> None:
-        self._store[key] = str(value)
+    async def set(
+        self, key: str, value: str | bytes, ex: int | None = None, nx: bool = False
+    ) -> bool | None:
+        if nx and key in self._store:
+            return None
+        # Like the app's client (decode_responses=True), bytes read back as str
+        self._store[key] = value.decode() if isinstance(value, bytes) else str(value)
         if ex:
             self._ttls[key] = ex
+        return True
 
     async def setex(self, key: str, seconds: int, value: str) -> None:
         self._store[key] = str(value)
         self._ttls[key] = seconds
 
+    async def exists(self, *keys: str) -> int:
+        return sum(key in self._store for key in keys)
+
     async def incr(self, key: str) -> int:
         val = int(self._store.get(key, "0")) + 1
         self._store[key] = str(val)
         return val
 
+    async def decr(self, key: str) -> int:
+        val = int(self._store.get(key, "0")) - 1
+        self._store[key] = str(val)
+        return val
+
+    async def delete(self, *keys: str) -> int:
+        removed = 0
+        for key in keys:
+            removed += self._store.pop(key, None) is not None
+            self._ttls.pop(key, None)
+            self._bits.pop(key, None)
+            removed += self._hashes.pop(key, None) is not None
+        return removed
+
+    async def hget(self, key: str, field: str) -> str | None:
+        return self._hashes.get(key, {}).get(field)
+
+    async def hmget(self, key: str, *fields: str) -> list[str | None]:
+        values = self._hashes.get(key, {})
+        return [values.get(field) for field in fields]
+
+    async def hset(
+        self, key: str, field: str | None = None, value=None, mapping: dict | None = None
+    ) -> int:
+        values = self._hashes.setdefault(key, {})
+        items = dict(mapping or {})
+        if field is not None:
+            items[field] = value
+        added = sum(field not in values for field in items)
+        values.update({f: str(v) for f, v in items.items()})
+        return added
+
+    async def hincrby(self, key: str, field: str, amount: int = 1) -> int:
+        values = self._hashes.setdefault(key, {})
+        val = int(values.get(field, "0")) + amount
+        values[field] = str(val)
+        return val
+
     async def expire(self, key: str, seconds: int) -> None:
         self._ttls[key] = seconds
 
+    async def expireat(self, key: str, when: int) -> None:
+        self._ttls[key] = when
+
+    async def getbit(self, key: str, offset: int) -> int:
+        return int(offset in self._bits.get(key, ()))
+
+    async def setbit(self, key: str, offset: int, value: int) -> int:
+        bits = self._bits.setdefault(key, set())
+        previous = int(offset in bits)
+        if value:
+            bits.add(offset)
+        else:
+            bits.discard(offset)
+        return previous
+
     async def ping(self) -> bool:
         return True
 
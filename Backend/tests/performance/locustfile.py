@@ -4,6 +4,10 @@ Run:
     locust -f tests/performance/locustfile.py --headless \
         -u 100 -r 10 --run-time 2m \
         --host http://localhost:8000
+
+Size the server's connection pool for the run so requests don't queue
+on pool checkout instead of measuring the app, e.g. for a single worker:
+    DB_POOL_SIZE=50 DB_MAX_OVERFLOW=20 uvicorn app.main:app
 """
 
 import uuid
@@ -18,13 +22,22 @@ class TetherUser(HttpUser):
     wait_time = between(1, 3)
 
     def on_start(self):
-        """Each virtual user gets a fake JWT for testing.
+        """Each virtual user registers its own account.
 
-        In a real load test, override get_current_user on the server
-        or use a test-mode JWT issuer.
+        Requests then carry a real access token, so every call goes through
+        the same JWT check and user lookup as production traffic.
         """
+        resp = self.client.post(
+            "/auth/register",
+            json={
+                "email": f"load-{uuid.uuid4().hex}@example.com",
+                "password": "load-test-password",
+                "display_name": "Load Tester",
+            },
+        )
+        resp.raise_for_status()
         self.headers = {
-            "Authorization": "Bearer test-load-token",
+            "Authorization": f"Bearer {resp.json()['access_token']}",
             "Content-Type": "application/json",
         }
         self.project_id = None
@@ -1,11 +1,37 @@
 import uuid
 from datetime import datetime, timezone
+from unittest.mock import AsyncMock, patch
 
+import httpx
+import jwt
 import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jwt.algorithms import RSAAlgorithm
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.user import User
-from app.services.auth_service import issue_tokens, upsert_user
+from app.services import auth_service
+from app.services.auth_service import (
+    decode_access_token,
+    issue_tokens,
+    upsert_user,
+    verify_apple_token,
+    verify_google_token,
+)
+
+
+def _rsa_signing_key(kid: str) -> tuple[str, dict]:
+    """Generate an RSA key pair; returns (private PEM, public JWK)."""
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    private_pem = private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    ).decode()
+    public_jwk = RSAAlgorithm.to_jwk(private_key.public_key(), as_dict=True)
+    public_jwk["kid"] = kid
+    return private_pem, public_jwk
 
 
 @pytest.mark.asyncio
@@ -123,3 +149,125 @@ async def test_token_structure():
     assert len(tokens["refresh_token"]) > 20
     # Tokens should be different
     assert tokens["access_token"] != tokens["refresh_token"]
+
+
+@pytest.mark.asyncio
+async def test_refresh_rotates_and_revokes_old_token(client):
+    tokens = issue_tokens(uuid.uuid4())
+
+    response = await client.post(
+        "/auth/refresh", json={"refresh_token": tokens["refresh_token"]}
+    )
+    assert response.status_code == 200
+    assert response.json()["refresh_token"] != tokens["refresh_token"]
+
+    # Reusing the rotated-out refresh token must fail
+    response = await client.post(
+        "/auth/refresh", json={"refresh_token": tokens["refresh_token"]}
+    )
+    assert response.status_code == 401
+    assert "revoked" in response.json()["detail"]
+
+
+def test_revocation_filter_sized_from_settings():
+    # 10k revocations a day at a one-in-a-million false-positive rate fit in
+    # about 35 KiB per expiry day
+    assert auth_service._bloom_size(10_000, 1e-6) == (287_552, 20)
+
+    key, offsets = auth_service._revocation_slots("some-jti", 86400 * 20_000)
+    assert key == "revoked_refresh:20000"
+    assert len(set(offsets)) == auth_service.REVOKED_REFRESH_HASHES
+    assert all(0 <= o < auth_service.REVOKED_REFRESH_BITS for o in offsets)
+
+
+def _mock_jwks_http(public_jwk: dict, headers: dict | None = None) -> AsyncMock:
+    mock_http = AsyncMock(spec=httpx.AsyncClient)
+    mock_http.get = AsyncMock(
+        return_value=httpx.Response(
+            200,
+            json={"keys": [public_jwk]},
+            headers=headers,
+            request=httpx.Request("GET", "https://example.com/jwks"),
+        )
+    )
+    return mock_http
+
+
+@pytest.mark.asyncio
+async def test_verify_google_token_locally(monkeypatch):
+    private_pem, public_jwk = _rsa_signing_key("google-kid-1")
+    mock_http = _mock_jwks_http(public_jwk, {"cache-control": "public, max-age=600"})
+    monkeypatch.setattr(auth_service, "get_shared_client", lambda: mock_http)
+    monkeypatch.setattr(
+        auth_service, "_google_jwks", auth_service._JWKSCache(auth_service.GOOGLE_JWKS_URL)
+    )
+    monkeypatch.setattr(auth_service.settings, "GOOGLE_CLIENT_ID", "client")
+
+    token = jwt.encode(
+        {"sub": "google_local_1", "aud": "client", "iss": "accounts.google.com"},
+        private_pem,
+        algorithm="RS256",
+        headers={"kid": "google-kid-1"},
+    )
+
+    assert (await verify_google_token(token))["sub"] == "google_local_1"
+    assert (await verify_google_token(token))["sub"] == "google_local_1"
+    assert mock_http.get.call_count == 1
+
+    wrong_aud = jwt.encode(
+        {"sub": "google_local_1", "aud": "other", "iss": "accounts.google.com"},
+        private_pem,
+        algorithm="RS256",
+        headers={"kid": "google-kid-1"},
+    )
+    with pytest.raises(ValueError):
+        await verify_google_token(wrong_aud)
+
+
+@pytest.mark.asyncio
+async def test_verify_apple_token_caches_jwks(monkeypatch):
+    private_pem, public_jwk = _rsa_signing_key("apple-kid-1")
+    mock_http = _mock_jwks_http(public_jwk)
+    monkeypatch.setattr(auth_service, "get_shared_client", lambda: mock_http)
+    monkeypatch.setattr(
+        auth_service, "_apple_jwks", auth_service._JWKSCache(auth_service.APPLE_JWKS_URL)
+    )
+    monkeypatch.setattr(auth_service.settings, "APPLE_TEAM_ID", "team")
+
+    token = jwt.encode(
+        {"sub": "apple_jwks_1", "aud": "team", "iss": auth_service.APPLE_ISSUER},
+        private_pem,
+        algorithm="RS256",
+        headers={"kid": "apple-kid-1"},
+    )
+
+    assert (await verify_apple_token(token))["sub"] == "apple_jwks_1"
+    assert (await verify_apple_token(token))["sub"] == "apple_jwks_1"
+    assert mock_http.get.call_count == 1
+
+
+def test_decode_access_token_reverifies_after_credits(monkeypatch):
+    monkeypatch.setattr(auth_service, "_token_cache", auth_service.OrderedDict())
+    token = issue_tokens(uuid.uuid4())["access_token"]
+
+    with patch.object(auth_service.jwt, "decode", wraps=auth_service.jwt.decode) as decode:
+        for _ in range(auth_service.TOKEN_CACHE_CREDITS + 1):
+            assert decode_access_token(token)["type"] == "access"
+        assert decode.call_count == 1
+
+        decode_access_token(token)
+        assert decode.call_count == 2
+
+
+def test_decode_access_token_rejects_expired_cached_claims(monkeypatch):
+    monkeypatch.setattr(auth_service, "_token_cache", auth_service.OrderedDict())
+    token = issue_tokens(uuid.uuid4())["access_token"]
+    claims = decode_access_token(token)
+
+    expires = claims["exp"]
+    monkeypatch.setattr(auth_service.time, "time", lambda: expires + 1)
+    with patch.object(
+        auth_service.jwt, "decode", side_effect=auth_service.PyJWTError("expired")
+    ):
+        with pytest.raises(auth_service.PyJWTError):
+            decode_access_token(token)
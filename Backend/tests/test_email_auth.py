@@ -1,12 +1,20 @@
+import asyncio
 import uuid
 from datetime import datetime, timezone
+from unittest.mock import AsyncMock, patch
 
 import pytest
 from httpx import AsyncClient
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import settings
 from app.models.user import User
-from app.services.auth_service import hash_password
+from app.services import email_service
+from app.services.auth_service import hash_password, verify_password
+from app.services.email_service import send_email, send_password_reset_email
+
+# Hashed once for every test that uses the email_user fixture
+EMAIL_USER_PASSWORD_HASH = hash_password("TestPass123!")
 
 
 @pytest.fixture
@@ -18,7 +26,7 @@ async def email_user(db_session: AsyncSession) -> User:
         display_name="Email User",
         auth_provider="email",
         auth_provider_id="email:emailuser@example.com",
-        password_hash=hash_password("TestPass123!"),
+        password_hash=EMAIL_USER_PASSWORD_HASH,
         email_verified=False,
         settings_json={"visibility": "private"},
         created_at=datetime.now(timezone.utc),
@@ -149,3 +157,91 @@ async def test_register_then_login_flow(client: AsyncClient):
     )
     assert login_response.status_code == 200
     assert login_response.json()["access_token"]
+
+
+def test_hash_password_uses_configured_rounds():
+    """Password hashes use the BCRYPT_ROUNDS work factor."""
+    with patch.object(settings, "BCRYPT_ROUNDS", 5):
+        hashed = hash_password("SecurePass123!")
+
+    assert hashed.startswith("$2b$05$")
+    assert verify_password("SecurePass123!", hashed)
+
+
+@pytest.mark.asyncio
+async def test_password_reset_email_link_is_escaped():
+    with patch(
+        "app.services.email_service.send_email", new=AsyncMock(return_value=True)
+    ) as send:
+        await send_password_reset_email("user@example.com", "a.b&c")
+
+    to, subject, body = send.call_args.args
+    assert subject == "Reset your Tether password"
+    assert "/reset-password?token=a.b%26c" in body
+    assert "&c" not in body
+
+
+class FakeSMTP:
+    """Stand-in for aiosmtplib.SMTP that records connections and sends."""
+
+    instances: list["FakeSMTP"] = []
+
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+        self.is_connected = False
+        self.sent: list = []
+        self.drop_next = False
+        FakeSMTP.instances.append(self)
+
+    async def connect(self):
+        self.is_connected = True
+
+    async def send_message(self, message):
+        if self.drop_next:
+            self.drop_next = False
+            self.is_connected = False
+            raise email_service.aiosmtplib.SMTPServerDisconnected("gone")
+        await asyncio.sleep(0)  # Let concurrent sends overlap
+        self.sent.append(message)
+
+    def close(self):
+        self.is_connected = False
+
+
+@pytest.mark.asyncio
+async def test_send_email_reuses_smtp_connection(monkeypatch):
+    FakeSMTP.instances = []
+    monkeypatch.setattr(email_service.aiosmtplib, "SMTP", FakeSMTP)
+    monkeypatch.setattr(email_service, "_idle_smtp", [])
+    monkeypatch.setattr(email_service.settings, "SMTP_HOST", "smtp.example.com")
+
+    assert await send_email("a@example.com", "Hi", "<p>1</p>")
+    assert await send_email("b@example.com", "Hi", "<p>2</p>")
+    assert len(FakeSMTP.instances) == 1
+    assert len(FakeSMTP.instances[0].sent) == 2
+
+    # A dropped connection is re-established and the message retried once
+    FakeSMTP.instances[0].drop_next = True
+    assert await send_email("c@example.com", "Hi", "<p>3</p>")
+    assert len(FakeSMTP.instances) == 2
+    assert len(FakeSMTP.instances[1].sent) == 1
+
+
+@pytest.mark.asyncio
+async def test_send_email_pools_concurrent_sends(monkeypatch):
+    FakeSMTP.instances = []
+    monkeypatch.setattr(email_service.aiosmtplib, "SMTP", FakeSMTP)
+    monkeypatch.setattr(email_service, "_idle_smtp", [])
+    monkeypatch.setattr(email_service, "_smtp_slots", asyncio.Semaphore(2))
+    monkeypatch.setattr(email_service.settings, "SMTP_HOST", "smtp.example.com")
+
+    results = await asyncio.gather(
+        *(send_email(f"{i}@example.com", "Hi", "<p>x</p>") for i in range(6))
+    )
+
+    # Sends overlap on separate connections, capped at the pool size, and
+    # every connection is kept for reuse
+    assert all(results)
+    assert len(FakeSMTP.instances) == 2
+    assert sum(len(smtp.sent) for smtp in FakeSMTP.instances) == 6
+    assert len(email_service._idle_smtp) == 2
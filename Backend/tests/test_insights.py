@@ -184,6 +184,20 @@ async def test_heatmap_with_sessions(client):
         assert entry["focused_minutes"] > 0
 
 
+@pytest.mark.asyncio
+async def test_heatmap_buckets_match_python_weekday(client):
+    """Heatmap hour/day_of_week use UTC hour and Monday=0 numbering."""
+    await _create_completed_session(client, days_ago=2, hour=7, focused_seconds=600)
+    expected = datetime.fromisoformat(_session_time(days_ago=2, hour=7))
+
+    response = await client.get("/insights/heatmap?days=7")
+    data = response.json()
+
+    assert data == [
+        {"hour": 7, "day_of_week": expected.weekday(), "focused_minutes": 10.0}
+    ]
+
+
 # --- /insights/goals endpoint ---
 
 
@@ -342,6 +356,25 @@ async def test_optimal_session_with_data(client):
     assert optimal["sample_size"] >= 4
 
 
+@pytest.mark.asyncio
+async def test_optimal_session_sparse_data_uses_largest_bucket(client):
+    """Without 3 samples in any bucket, the most-used bucket is recommended."""
+    for i in range(2):
+        await _create_completed_session(
+            client, days_ago=i, duration_seconds=45 * 60, focused_seconds=40 * 60
+        )
+    await _create_completed_session(
+        client, days_ago=3, duration_seconds=15 * 60, focused_seconds=15 * 60
+    )
+
+    response = await client.get("/insights")
+    optimal = response.json()["optimal_session"]
+
+    assert optimal["recommended_minutes"] == 45
+    assert optimal["sample_size"] == 2
+    assert optimal["avg_focus_ratio"] == round(40 / 45, 3)
+
+
 # --- Trend endpoint (via full insights) ---
 
 
@@ -371,3 +404,66 @@ async def test_trend_daily_data(client):
     day_with_two = next(t for t in trends if t["session_count"] == 2)
     assert day_with_two["focused_minutes"] == 25.0  # (900+600)/60
     assert day_with_two["distraction_count"] == 1  # 1+0
+
+
+@pytest.mark.asyncio
+async def test_trend_tracks_edits_to_completed_sessions(client):
+    """Re-patching a completed session replaces its daily totals, not adds."""
+    session = await _create_completed_session(
+        client, days_ago=0, focused_seconds=1200, distraction_count=3
+    )
+    resp = await client.patch(
+        f"/sessions/{session['id']}",
+        json={"focused_seconds": 600, "distraction_count": 1},
+    )
+    assert resp.status_code == 200
+
+    # A session created already complete counts immediately
+    resp = await client.post(
+        "/sessions",
+        json={
+            "start_time": _session_time(days_ago=0, hour=11),
+            "focused_seconds": 300,
+            "is_complete": True,
+        },
+    )
+    assert resp.status_code == 201
+
+    trends = (await client.get("/insights?days=7")).json()["trends"]
+    assert len(trends) == 1
+    assert trends[0]["session_count"] == 2
+    assert trends[0]["focused_minutes"] == 15.0  # (600+300)/60
+    assert trends[0]["distraction_count"] == 1
+
+
+# --- Streak ---
+
+
+@pytest.mark.asyncio
+async def test_goals_streak_counts_consecutive_days(client):
+    """Streak goal counts consecutive session days ending today."""
+    for days_ago in (0, 1, 2, 4):
+        await _create_completed_session(client, days_ago=days_ago, hour=0)
+
+    response = await client.get("/insights/goals")
+    data = response.json()
+
+    streak_goal = next(g for g in data if g["goal_type"] == "streak")
+    assert streak_goal["current_value"] == 3.0
+    assert streak_goal["target_value"] == 4.0
+
+
+# --- /insights/session-summary/stream ---
+
+
+@pytest.mark.asyncio
+async def test_session_summary_stream_fallback(client):
+    """Streaming summary returns the rule-based text when no LLM is configured."""
+    s = await _create_completed_session(client, days_ago=1)
+
+    response = await client.post(
+        f"/insights/session-summary/stream?session_id={s['id']}"
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert len(response.text) > 0
@@ -291,6 +291,67 @@ async def test_notion_importer_normalize():
     assert tasks[1] == {"title": "Write tests", "priority": 1, "due_date": None}
 
 
+def test_notion_normalize_prefers_due_over_due_date():
+    """A "Due" column wins over "Due Date" regardless of column order."""
+    page = {
+        "properties": {
+            "Due Date": {"type": "date", "date": {"start": "2026-05-01"}},
+            "Notes": {"type": "rich_text", "rich_text": []},
+            "Due": {"type": "date", "date": {"start": "2026-04-01"}},
+            "Name": {"type": "title", "title": []},
+        },
+    }
+
+    assert NotionImporter._normalize_page(page) == {
+        "title": "Untitled",
+        "priority": 1,
+        "due_date": "2026-04-01",
+    }
+
+
+@pytest.mark.asyncio
+async def test_notion_importer_follows_cursor():
+    """Notion import keeps querying until has_more is false."""
+    importer = NotionImporter()
+
+    def page(title):
+        return {"properties": {"Name": {"type": "title", "title": [{"plain_text": title}]}}}
+
+    mock_client = AsyncMock(spec=httpx.AsyncClient)
+    mock_client.post = AsyncMock(side_effect=[
+        httpx.Response(
+            200, json={"results": [page("First")], "has_more": True, "next_cursor": "abc"}
+        ),
+        httpx.Response(
+            200, json={"results": [page("Second")], "has_more": False, "next_cursor": None}
+        ),
+    ])
+
+    tasks = await importer.import_tasks("fake-token", "db-123", http_client=mock_client)
+
+    assert [t["title"] for t in tasks] == ["First", "Second"]
+    assert mock_client.post.await_args_list[1].kwargs["json"]["start_cursor"] == "abc"
+    assert importer.truncated is False
+
+
+@pytest.mark.asyncio
+async def test_notion_importer_flags_truncation(caplog):
+    """Notion import stops at MAX_PAGES and reports that rows were left."""
+    importer = NotionImporter()
+    importer.MAX_PAGES = 2
+
+    mock_client = AsyncMock(spec=httpx.AsyncClient)
+    mock_client.post = AsyncMock(return_value=httpx.Response(
+        200, json={"results": [], "has_more": True, "next_cursor": "more"}
+    ))
+
+    await importer.import_tasks("fake-token", "db-123", http_client=mock_client)
+
+    assert mock_client.post.await_count == 2
+    assert importer.truncated is True
+    assert "stopped at 2 pages" in caplog.text
+
+
 @pytest.mark.asyncio
 async def test_notion_importer_api_error():
     """Test Notion import handles API errors gracefully."""
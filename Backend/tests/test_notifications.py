@@ -8,12 +8,15 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.device import Device
 from app.models.user import User
 from app.services.notification_service import (
+    PUSH_TOKEN_CACHE_TTL_SECONDS,
+    invalidate_user_devices,
     notify_encourage,
     notify_friend_request,
     notify_ping,
     notify_streak_milestone,
     send_push_notification,
 )
+from tests.conftest import FakeRedis
 
 
 @pytest.fixture
@@ -185,6 +188,65 @@ async def test_send_push_exception_handling(
     assert sent == 0
 
 
+@pytest.mark.asyncio
+async def test_send_push_partial_failure(
+    db_session: AsyncSession, target_user: User, ios_device: Device
+):
+    """One device failing doesn't prevent delivery to the others."""
+    device2 = Device(
+        id=uuid.uuid4(),
+        user_id=target_user.id,
+        token="second-ios-token",
+        platform="ios",
+        created_at=datetime.now(timezone.utc),
+    )
+    db_session.add(device2)
+    await db_session.commit()
+
+    ok = MagicMock(is_successful=True)
+    apns = MagicMock()
+    apns.send_notification = AsyncMock(side_effect=[Exception("Connection lost"), ok])
+    sent = await send_push_notification(
+        db_session, target_user.id, "Hello", "World", apns_client=apns
+    )
+    assert sent == 1
+    assert apns.send_notification.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_send_push_caches_devices_until_invalidated(
+    db_session: AsyncSession, target_user: User, ios_device: Device
+):
+    """Device tokens are cached per user; invalidation picks up new devices."""
+    apns = _make_apns_client(successful=True)
+    redis = FakeRedis()
+    assert await send_push_notification(
+        db_session, target_user.id, "Hello", "World", apns_client=apns, redis_client=redis
+    ) == 1
+    assert redis._ttls[f"push_tokens:{target_user.id}"] == PUSH_TOKEN_CACHE_TTL_SECONDS
+
+    db_session.add(
+        Device(
+            id=uuid.uuid4(),
+            user_id=target_user.id,
+            token="late-ios-token",
+            platform="ios",
+            created_at=datetime.now(timezone.utc),
+        )
+    )
+    await db_session.commit()
+
+    # Still served from cache
+    assert await send_push_notification(
+        db_session, target_user.id, "Hello", "World", apns_client=apns, redis_client=redis
+    ) == 1
+
+    await invalidate_user_devices(redis, target_user.id)
+    assert await send_push_notification(
+        db_session, target_user.id, "Hello", "World", apns_client=apns, redis_client=redis
+    ) == 2
+
+
 # ── notify_encourage tests ────────────────────────────────────────────
 
 
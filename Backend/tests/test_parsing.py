@@ -1,5 +1,7 @@
 import pytest
 
+from app.services.task_parsing_service import _parse_tasks_json
+
 
 @pytest.mark.asyncio
 async def test_parse_tasks_endpoint(client):
@@ -51,3 +53,29 @@ async def test_parse_tasks_requires_auth(db_engine, test_user):
             json={"text": "Write a report"},
         )
     assert response.status_code in (401, 403)
+
+
+def test_parse_tasks_json_normalizes_loose_output():
+    """Schema-conforming and loose LLM output normalize the same way."""
+    strict = '[{"title": " Fix bug ", "estimate_minutes": 30, "priority": "high"}]'
+    loose = (
+        'Sure!\n```json\n[{"title": " Fix bug ", "estimate_minutes": "30", '
+        '"priority": "HIGH", "extra": 1}, 42]\n```'
+    )
+    expected = [{
+        "title": "Fix bug",
+        "estimate_minutes": 30,
+        "priority": "high",
+        "project_name": None,
+        "due_date": None,
+    }]
+
+    assert _parse_tasks_json(strict) == expected
+    assert _parse_tasks_json(loose) == expected
+    assert _parse_tasks_json('[{"title": "Nap", "estimate_minutes": 0, "priority": null}]') == [{
+        "title": "Nap",
+        "estimate_minutes": None,
+        "priority": "medium",
+        "project_name": None,
+        "due_date": None,
+    }]
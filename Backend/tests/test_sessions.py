@@ -1,5 +1,5 @@
 import uuid
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 
 import pytest
 
@@ -120,6 +120,29 @@ async def test_append_events_dedup(client):
     assert resp2.status_code == 404
 
 
+@pytest.mark.asyncio
+async def test_append_events_dedup_mixed_batch(client):
+    now = datetime.now(timezone.utc)
+    create_resp = await client.post("/sessions", json={
+        "start_time": now.isoformat(),
+    })
+    session_id = create_resp.json()["id"]
+
+    start = {"event_type": "START", "timestamp": now.isoformat()}
+    await client.post(f"/sessions/{session_id}/events", json={"events": [start]})
+
+    # Previously stored START, a repeated PAUSE within the batch, and one new event
+    pause = {"event_type": "PAUSE", "timestamp": (now + timedelta(minutes=1)).isoformat()}
+    resume = {"event_type": "RESUME", "timestamp": (now + timedelta(minutes=2)).isoformat()}
+    resp = await client.post(
+        f"/sessions/{session_id}/events",
+        json={"events": [start, pause, pause, resume]},
+    )
+    assert resp.status_code == 201
+    assert [e["event_type"] for e in resp.json()] == ["PAUSE", "RESUME"]
+    assert all(e["created_at"] for e in resp.json())
+
+
 @pytest.mark.asyncio
 async def test_append_events_nonexistent_session(client):
     response = await client.post(f"/sessions/{uuid.uuid4()}/events", json={
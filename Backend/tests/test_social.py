@@ -1,12 +1,18 @@
 import uuid
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 
 import pytest
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.friendship import Friendship
+from app.models.group_member import GroupMember
+from app.models.session import Session
 from app.models.social_event import SocialEvent
 from app.models.user import User
+from app.models.user_day_stats import UserDayStats
+from app.services._redis import get_script
+from app.services.social_service import DAILY_QUOTA_LUA, _daily_quota
+from tests.conftest import FakeRedis
 
 
 @pytest.mark.asyncio
@@ -36,6 +42,34 @@ async def test_invite_nonexistent_user(client):
     assert "not found" in response.json()["detail"].lower()
 
 
+@pytest.mark.asyncio
+async def test_invite_over_daily_limit(client, test_user, second_user):
+    from app.main import app
+
+    today = datetime.now(timezone.utc).date()
+    await app.state.redis.set(f"invites:{test_user.id}:{today}", "20")
+
+    response = await client.post(
+        "/friends/invite", json={"email": "friend@example.com"}
+    )
+    assert response.status_code == 429
+    assert await app.state.redis.get(f"invites:{test_user.id}:{today}") == "20"
+
+
+@pytest.mark.asyncio
+async def test_failed_invites_do_not_use_daily_limit(client, second_user):
+    for _ in range(20):
+        response = await client.post(
+            "/friends/invite", json={"email": "nobody@example.com"}
+        )
+        assert response.status_code == 400
+
+    response = await client.post(
+        "/friends/invite", json={"email": "friend@example.com"}
+    )
+    assert response.status_code == 201
+
+
 @pytest.mark.asyncio
 async def test_invite_self(client, test_user):
     response = await client.post(
@@ -79,6 +113,10 @@ async def test_accept_invite(client, db_session, test_user, second_user):
     assert response.status_code == 200
     assert response.json()["status"] == "accepted"
 
+    # Already accepted: nothing left to accept
+    response = await client.post(f"/friends/{friendship.id}/accept")
+    assert response.status_code == 404
+
     # Restore original user
     app.dependency_overrides[get_current_user] = lambda: test_user
 
@@ -127,6 +165,33 @@ async def test_list_friends_after_accept(client, db_session, test_user, second_u
     assert friends[0]["status"] == "accepted"
 
 
+@pytest.mark.asyncio
+async def test_list_friends_resolves_both_sides(client, db_session, test_user, second_user):
+    third_user = User(
+        id=uuid.uuid4(),
+        email="third@example.com",
+        display_name="Third User",
+        auth_provider="google",
+        auth_provider_id="google_test_789",
+        settings_json={},
+    )
+    db_session.add(third_user)
+    for other, status in ((second_user, "accepted"), (third_user, "pending")):
+        uid1, uid2 = (min(test_user.id, other.id), max(test_user.id, other.id))
+        db_session.add(
+            Friendship(user_id_1=uid1, user_id_2=uid2, status=status, initiated_by=test_user.id)
+        )
+    await db_session.commit()
+
+    response = await client.get("/friends")
+    assert response.status_code == 200
+    by_user = {f["user_id"]: f for f in response.json()}
+    assert by_user[str(second_user.id)]["display_name"] == "Friend User"
+    assert by_user[str(second_user.id)]["status"] == "accepted"
+    assert by_user[str(third_user.id)]["display_name"] == "Third User"
+    assert by_user[str(third_user.id)]["status"] == "pending"
+
+
 @pytest.mark.asyncio
 async def test_encourage_friend(client, db_session, test_user, second_user):
     # Create accepted friendship
@@ -215,3 +280,169 @@ async def test_ping_rate_limit(client, db_session, test_user, second_user):
     )
     assert response.status_code == 429
     assert "limit" in response.json()["detail"].lower()
+
+
+@pytest.mark.asyncio
+async def test_leaderboard_ranks_visible_members(client, db_session, test_user, second_user):
+    response = await client.post("/groups", json={"name": "Study"})
+    assert response.status_code == 201
+    group_id = uuid.UUID(response.json()["id"])
+
+    private_user = User(
+        id=uuid.uuid4(),
+        email="hidden@example.com",
+        display_name="Hidden User",
+        auth_provider="google",
+        auth_provider_id="google_test_hidden",
+        settings_json={"visibility": "private"},
+    )
+    db_session.add(private_user)
+    now = datetime.now(timezone.utc)
+    for member, focused in ((second_user, 3000), (private_user, 9000), (test_user, 1200)):
+        if member is not test_user:
+            db_session.add(GroupMember(group_id=group_id, user_id=member.id))
+        db_session.add(
+            UserDayStats(
+                user_id=member.id,
+                day=now.date(),
+                focused_seconds=focused,
+                session_count=1,
+            )
+        )
+    await db_session.commit()
+
+    response = await client.get(f"/groups/{group_id}/leaderboard")
+    assert response.status_code == 200
+    entries = response.json()
+    # The private member is hidden; the caller always sees themselves
+    assert [e["user_id"] for e in entries] == [str(second_user.id), str(test_user.id)]
+    assert [e["rank"] for e in entries] == [1, 2]
+    assert entries[0]["focused_seconds"] == 3000
+    assert entries[1]["session_count"] == 1
+
+
+@pytest.mark.asyncio
+async def test_leaderboard_covers_last_seven_calendar_days(client, db_session, test_user):
+    response = await client.post("/groups", json={"name": "Week"})
+    group_id = response.json()["id"]
+
+    today = datetime.now(timezone.utc).date()
+    for days_ago, focused in ((0, 100), (6, 200), (7, 400)):
+        db_session.add(
+            UserDayStats(
+                user_id=test_user.id,
+                day=today - timedelta(days=days_ago),
+                focused_seconds=focused,
+                session_count=1,
+            )
+        )
+    await db_session.commit()
+
+    response = await client.get(f"/groups/{group_id}/leaderboard")
+    # Today and the six days before it count; the eighth day back doesn't
+    assert response.json()[0]["focused_seconds"] == 300
+    assert response.json()[0]["session_count"] == 2
+
+
+@pytest.mark.asyncio
+async def test_leaderboard_cached_until_session_completes(client, db_session, test_user):
+    response = await client.post("/groups", json={"name": "Solo"})
+    group_id = response.json()["id"]
+
+    response = await client.get(f"/groups/{group_id}/leaderboard")
+    assert response.json()[0]["focused_seconds"] == 0
+
+    # Totals written behind the API's back are not seen until the cache expires
+    db_session.add(
+        UserDayStats(
+            user_id=test_user.id,
+            day=datetime.now(timezone.utc).date(),
+            focused_seconds=600,
+            session_count=1,
+        )
+    )
+    await db_session.commit()
+    response = await client.get(f"/groups/{group_id}/leaderboard")
+    assert response.json()[0]["focused_seconds"] == 0
+
+    # Completing a session through the API invalidates it
+    response = await client.post(
+        "/sessions", json={"start_time": datetime.now(timezone.utc).isoformat()}
+    )
+    response = await client.patch(
+        f"/sessions/{response.json()['id']}",
+        json={"focused_seconds": 300, "is_complete": True},
+    )
+    assert response.status_code == 200
+    response = await client.get(f"/groups/{group_id}/leaderboard")
+    assert response.json()[0]["focused_seconds"] == 900
+
+
+@pytest.mark.asyncio
+async def test_activity_feed_groups_reactions_by_session(
+    client, db_session, test_user, second_user
+):
+    uid1, uid2 = (min(test_user.id, second_user.id), max(test_user.id, second_user.id))
+    db_session.add(
+        Friendship(user_id_1=uid1, user_id_2=uid2, status="accepted", initiated_by=test_user.id)
+    )
+    now = datetime.now(timezone.utc)
+    reacted = Session(user_id=second_user.id, start_time=now, focused_seconds=600, is_complete=True)
+    quiet = Session(user_id=second_user.id, start_time=now, focused_seconds=300, is_complete=True)
+    db_session.add_all([reacted, quiet])
+    await db_session.commit()
+
+    for reaction_type in ("fire", "thumbs_up"):
+        response = await client.post(
+            f"/sessions/{reacted.id}/react", json={"reaction_type": reaction_type}
+        )
+        assert response.status_code == 201
+    response = await client.post(f"/sessions/{reacted.id}/react", json={"reaction_type": "fire"})
+    assert response.status_code == 400
+
+    response = await client.get("/social/activity")
+    assert response.status_code == 200
+    by_session = {item["id"]: item for item in response.json()}
+    assert by_session[str(quiet.id)]["reactions"] == []
+    reactions = by_session[str(reacted.id)]["reactions"]
+    assert sorted(r["reaction_type"] for r in reactions) == ["fire", "thumbs_up"]
+    assert {r["display_name"] for r in reactions} == {test_user.display_name}
+    assert by_session[str(reacted.id)]["display_name"] == "Friend User"
+
+    response = await client.get(f"/sessions/{reacted.id}/reactions")
+    assert response.status_code == 200
+    assert len(response.json()) == 2
+
+
+def test_quota_script_registered_once_per_client():
+    redis = FakeRedis()
+    script = get_script(redis, DAILY_QUOTA_LUA)
+
+    assert get_script(redis, DAILY_QUOTA_LUA) is script
+    assert get_script(FakeRedis(), DAILY_QUOTA_LUA) is not script
+
+
+@pytest.mark.asyncio
+async def test_quota_refund_skips_expired_counter():
+    redis = FakeRedis()
+
+    with pytest.raises(RuntimeError):
+        async with _daily_quota(redis, "invites:test", 20, "limit"):
+            # The counter expires while the action is still running
+            await redis.delete("invites:test")
+            raise RuntimeError("invite failed")
+
+    # The refund must not recreate the key at -1 without a TTL
+    assert await redis.get("invites:test") is None
+
+
+@pytest.mark.asyncio
+async def test_quota_refunded_when_action_fails():
+    redis = FakeRedis()
+
+    with pytest.raises(RuntimeError):
+        async with _daily_quota(redis, "invites:test", 20, "limit"):
+            raise RuntimeError("invite failed")
+
+    assert await redis.get("invites:test") == "0"
+    assert redis._ttls["invites:test"] == 86400
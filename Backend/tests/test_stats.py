@@ -1,4 +1,4 @@
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 
 import pytest
 
@@ -37,6 +37,21 @@ async def test_stats_with_sessions(client):
     assert data["distraction_count"] == 2
 
 
+@pytest.mark.asyncio
+async def test_stats_streak_stops_at_gap(client):
+    now = datetime.now(timezone.utc)
+    for days_ago in (0, 1, 3):
+        resp = await client.post("/sessions", json={
+            "start_time": (now - timedelta(days=days_ago)).isoformat(),
+            "focused_seconds": 600,
+            "is_complete": True,
+        })
+        assert resp.status_code == 201
+
+    response = await client.get("/stats?period=weekly")
+    assert response.json()["current_streak"] == 2
+
+
 @pytest.mark.asyncio
 async def test_stats_daily_period(client):
     response = await client.get("/stats?period=daily")
@@ -1,5 +1,14 @@
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
 import pytest
 from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.subscription import Subscription
+from app.services import subscription_service
+from tests.conftest import FakeRedis
 
 
 async def test_get_subscription_status_free(client: AsyncClient):
@@ -76,3 +85,69 @@ async def test_webhook_endpoint_exists(client: AsyncClient):
     response = await client.post("/subscriptions/webhook")
     assert response.status_code == 200
     assert response.json()["status"] == "received"
+
+
+async def test_verify_refreshes_cached_status(client: AsyncClient):
+    """Test that a cached free status is dropped once a subscription verifies."""
+    response = await client.get("/subscriptions/status")
+    assert response.json()["is_pro"] is False
+
+    await client.post(
+        "/subscriptions/verify",
+        json={
+            "original_transaction_id": "test_txn_cached",
+            "product_id": "com.willhammond.tether.pro.monthly",
+        },
+    )
+
+    response = await client.get("/subscriptions/status")
+    assert response.json()["is_pro"] is True
+
+
+async def test_verify_invalidates_cache_after_commit(client: AsyncClient, db_engine):
+    """Test that the cached status is dropped only once the new row is visible."""
+    visible_at_delete = []
+    delete = FakeRedis.delete
+
+    async def checking_delete(redis, *keys):
+        async with AsyncSession(db_engine) as other:
+            result = await other.execute(
+                select(Subscription.id).where(
+                    Subscription.original_transaction_id == "test_txn_commit"
+                )
+            )
+            visible_at_delete.append(result.scalar_one_or_none() is not None)
+        return await delete(redis, *keys)
+
+    with patch.object(FakeRedis, "delete", checking_delete):
+        await client.post(
+            "/subscriptions/verify",
+            json={
+                "original_transaction_id": "test_txn_commit",
+                "product_id": "com.willhammond.tether.pro.monthly",
+            },
+        )
+
+    assert visible_at_delete == [True]
+
+
+async def test_lapsed_subscription_marked_expired(db_session, test_user):
+    """Test that reading a lapsed subscription records the expiry once."""
+    sub = Subscription(
+        user_id=test_user.id,
+        product_id="com.willhammond.tether.pro.monthly",
+        status="active",
+        original_transaction_id="test_txn_lapsed",
+        expiration_date=datetime.now(timezone.utc) - timedelta(days=1),
+    )
+    db_session.add(sub)
+    await db_session.flush()
+
+    status = await subscription_service.get_subscription_status(db_session, test_user.id)
+    assert status["is_pro"] is False
+    assert status["status"] == "expired"
+
+    result = await db_session.execute(
+        select(Subscription.status).where(Subscription.id == sub.id)
+    )
+    assert result.scalar_one() == "expired"
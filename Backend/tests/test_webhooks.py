@@ -1,3 +1,4 @@
+import asyncio
 import hashlib
 import hmac
 import json
@@ -136,9 +137,10 @@ async def test_deliver_webhook_success(sample_webhook):
 
     # Verify the signature is correct
     body = call_args.kwargs["content"]
+    assert json.loads(body) == {"test": True}
     expected_sig = hmac.new(
         sample_webhook.secret.encode("utf-8"),
-        body.encode("utf-8"),
+        body,
         hashlib.sha256,
     ).hexdigest()
     assert headers["X-Tether-Signature"] == f"sha256={expected_sig}"
@@ -192,6 +194,25 @@ async def test_deliver_webhook_succeeds_on_retry(sample_webhook):
     assert mock_client.post.call_count == 2
 
 
+@pytest.mark.asyncio
+async def test_deliver_webhook_gives_up_after_timeout(sample_webhook):
+    """A hanging endpoint can't hold delivery past the overall timeout."""
+
+    async def hang(*args, **kwargs):
+        await asyncio.sleep(10)
+
+    mock_client = AsyncMock(spec=httpx.AsyncClient)
+    mock_client.post = AsyncMock(side_effect=hang)
+
+    with patch("app.services.webhook_service.DELIVERY_TIMEOUT_SECONDS", 0.05):
+        result = await deliver_webhook(
+            sample_webhook, "session.start", {"test": True}, http_client=mock_client
+        )
+
+    assert result is False
+    mock_client.post.assert_called_once()
+
+
 # ── fire_webhooks service tests ──────────────────────────────────────
 
 
@@ -266,3 +287,37 @@ async def test_fire_webhooks_no_webhooks(db_session: AsyncSession, test_user):
     )
 
     assert delivered == 0
+
+
+@pytest.mark.asyncio
+async def test_fire_webhooks_delivers_concurrently(db_session: AsyncSession, test_user):
+    """A slow endpoint doesn't hold up delivery to the others."""
+    for name in ("slow", "fast"):
+        db_session.add(Webhook(
+            user_id=test_user.id,
+            url=f"https://example.com/{name}",
+            events=["session.end"],
+            secret="s" * 64,
+            is_active=True,
+        ))
+    await db_session.commit()
+
+    fast_delivered = asyncio.Event()
+
+    async def post(url, **kwargs):
+        if url.endswith("/slow"):
+            # Only completes once the other delivery has gone out
+            await asyncio.wait_for(fast_delivered.wait(), timeout=1.0)
+        else:
+            fast_delivered.set()
+        return httpx.Response(200, text="OK")
+
+    mock_client = AsyncMock(spec=httpx.AsyncClient)
+    mock_client.post = AsyncMock(side_effect=post)
+
+    delivered = await fire_webhooks(
+        db_session, test_user.id, "session.end", {"data": "test"},
+        http_client=mock_client,
+    )
+
+    assert delivered == 2